@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import datetime
 import functools
+import hashlib
 import logging
+import threading
+import time
 from collections.abc import Callable
-from typing import Concatenate, Optional
+from typing import Any, Concatenate, Optional
 from dataclasses import dataclass
 from typing import Optional
 
@@ -12,16 +15,19 @@ import requests
 from requests.adapters import HTTPAdapter
 from requests_toolbelt.sessions import BaseUrlSession  # type: ignore
 from urllib3.util import Retry
-from requests.exceptions import JSONDecodeError
+from json import JSONDecodeError
 
 from book_better.enums import BetterActivity, BetterVenue
 from book_better.logging import log_method_inputs_and_outputs
+from book_better.utils import court_number_from_text, json_dumps, json_loads
 from book_better.models import (
     ActivityCart,
     ActivitySlot,
     ActivityTime,
 )
 
+logger = logging.getLogger(__name__)
+
 type _LiveBetterClientInstanceMethod[**P, R] = Callable[
     Concatenate[LiveBetterClient, P], R
 ]
@@ -32,8 +38,8 @@ def _requires_authentication[**P, R](
 ) -> _LiveBetterClientInstanceMethod[P, R]:
     @functools.wraps(func)
     def wrapper(self: LiveBetterClient, *args: P.args, **kwargs: P.kwargs) -> R:
-        if not self.authenticated:
-            logging.info(
+        if not self._authenticated:
+            logger.info(
                 "requires_authentication: client is not authenticated, will authenticate"
             )
             self.authenticate()
@@ -41,7 +47,7 @@ def _requires_authentication[**P, R](
 
     return wrapper
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CartSummary:
     id: int
     source: str
@@ -50,6 +56,133 @@ class CartSummary:
     general_credit_available: int
     general_credit_max_applicable: int
 
+
+@dataclass(frozen=True, slots=True)
+class HTTPResult[T]:
+    """
+    Resultado de una llamada donde un 4xx es un caso esperado (slot lleno, ya
+    en el carrito…) y no merece lanzar y capturar un HTTPError.
+    """
+    ok: bool
+    status: int
+    body: dict
+    error_msg: str | None
+    value: T | None = None
+
+# Cache de clientes ya autenticados, por credenciales. Evita repetir el
+# handshake TLS + POST de login cada vez que se procesa una request.
+_CLIENT_CACHE_MAXSIZE = 32
+_CLIENT_CACHE_TTL_SECS = 10 * 60
+
+_client_cache: dict[str, tuple[float, LiveBetterClient]] = {}
+_client_cache_lock = threading.Lock()
+
+
+# Un único HTTPAdapter (y por tanto un único pool de urllib3) compartido por
+# todos los clientes: las conexiones keep-alive a better-admin.org.uk sobreviven
+# al cliente que las abrió. Cabeceras y cookies siguen siendo por sesión.
+_SHARED_POOL_CONNECTIONS = 32
+_SHARED_POOL_MAXSIZE = 64
+
+_shared_adapter: HTTPAdapter | None = None
+_shared_adapter_lock = threading.Lock()
+
+
+def _get_shared_adapter() -> HTTPAdapter:
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = HTTPAdapter(
+                pool_connections=_SHARED_POOL_CONNECTIONS,
+                pool_maxsize=_SHARED_POOL_MAXSIZE,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=2,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                ),
+            )
+        return _shared_adapter
+
+
+def _credentials_cache_key(username: str, password: str) -> str:
+    """Clave de caché sin guardar las credenciales en claro."""
+    return hashlib.sha256(f"{username}\x00{password}".encode()).hexdigest()
+
+
+def _hhmm_to_time(hhmm: str) -> datetime.time:
+    """'HH:MM' (ancho fijo) -> datetime.time, sin pasar por strptime."""
+    return datetime.time(int(hhmm[0:2]), int(hhmm[3:5]))
+
+
+def _as_int(value: object) -> int | None:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _cart_item_ids(cart_data: dict) -> frozenset[int]:
+    """
+    Todos los ids que aparecen en los items del carrito:
+    it["id"], it["item"]["id"] y it["items"][i]["id"].
+    """
+    items = cart_data.get("items") or cart_data.get("cart_items") or cart_data.get("lines") or []
+
+    ids: set[int] = set()
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        # patrón 1: id directo
+        candidates = [it.get("id")]
+        # patrón 2: anidado en item
+        sub = it.get("item")
+        if isinstance(sub, dict):
+            candidates.append(sub.get("id"))
+        # patrón 3: anidado en items[i]
+        subs = it.get("items")
+        if isinstance(subs, list):
+            candidates.extend(x.get("id") for x in subs if isinstance(x, dict))
+
+        for cand in candidates:
+            as_int = _as_int(cand)
+            if as_int is not None:
+                ids.add(as_int)
+
+    return frozenset(ids)
+
+
+def _error_body(response: requests.Response) -> tuple[dict, str]:
+    """
+    Body JSON de una respuesta de error ({} si no es un objeto JSON) y el
+    mensaje corto de Better, decodificando una sola vez. Sin objeto JSON, el
+    mensaje es el texto truncado, como en _error_message.
+    """
+    try:
+        body = json_loads(response.content)
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return {}, response.text[:200]
+    return body, body.get("message", "")
+
+
+def _error_message(response: requests.Response) -> str:
+    """Solo el mensaje corto de error de Better (o el texto truncado)."""
+    try:
+        return json_loads(response.content).get("message", "")
+    except Exception:
+        return response.text[:200]  # por si acaso, truncado
+
+
+def _activity_cart_from_data(data: dict) -> ActivityCart:
+    return ActivityCart(
+        id=data["id"],
+        amount=data["total"],
+        source=data["source"],
+    )
+
+
 def _slot_debug_label(raw_slot: dict) -> str:
     """
     Devuelve un label legible para logs de depuración.
@@ -63,49 +196,137 @@ def _slot_debug_label(raw_slot: dict) -> str:
         or "unknown"
     )
 
+def _bookable_slot_from_raw(raw_slot: dict) -> ActivitySlot | None:
+    """
+    Convierte un slot RAW de Better en ActivitySlot leyendo solo los campos
+    que usamos. Devuelve None si no tiene plazas o no es reservable ('BOOK').
+    """
+    if raw_slot.get("spaces", 0) <= 0:
+        return None
+    action = raw_slot.get("action_to_show") or {}
+    if action.get("status") != "BOOK":
+        return None
+
+    location = raw_slot["location"]
+    return ActivitySlot(
+        id=raw_slot["id"],
+        location_id=location["id"],
+        pricing_option_id=raw_slot["pricing_option_id"],
+        restriction_ids=tuple(raw_slot.get("restriction_ids") or ()),
+        name=location["slug"],
+        cart_type=raw_slot["cart_type"],
+        court_number=court_number_from_text(location["slug"]),
+    )
+
 class LiveBetterClient:
     HEADERS = {
         "Origin": "https://bookings.better.org.uk",
         "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0",
     }
+    JSON_HEADERS = {"Content-Type": "application/json"}
+    # (connect, read) del login: sin esto un socket colgado bloquea para siempre
+    LOGIN_TIMEOUT = (5, 15)
+    _CART_IDS_TTL_SECS = 2.0
+    # Parte fija del body de /api/checkout/complete (no se muta: se combina con |)
+    _CHECKOUT_SKELETON: dict[str, Any] = {
+        "completed_waivers": [],
+        "payments": [],
+        "selected_user_id": None,
+        "terms": [1],
+    }
 
     def __init__(self, username: str, password: str):
         self.username = username
         self.password = password
         self.base_url = "https://better-admin.org.uk"
+        self._authenticated = False
+        self._cart_item_ids_cache: tuple[float, frozenset[int]] | None = None
 
         self.session: requests.Session = BaseUrlSession(
             base_url="https://better-admin.org.uk/api/"
         )
         self.session.headers.update(self.HEADERS)
-        self.session.mount(
-            "https://",
-            HTTPAdapter(
-                max_retries=Retry(
-                    total=3,
-                    backoff_factor=2,
-                    status_forcelist=[429, 500, 502, 503, 504],
-                )
-            ),
-        )
+        # Sin esto, requests busca ~/.netrc y resuelve proxies del entorno en
+        # cada llamada; aquí siempre vamos directos a better-admin.org.uk.
+        self.session.trust_env = False
+        self.session.mount("https://", _get_shared_adapter())
+        # Métodos ya ligados para no resolver self.session.get/post en cada
+        # llamada. Si algún día se sustituye self.session, hay que re-ligarlos.
+        self._get = self.session.get
+        self._post = self.session.post
+
+    def _post_json(self, url: str, payload: dict, timeout=None) -> requests.Response:
+        """POST con el body ya serializado (orjson si está disponible)."""
+        return self._post(url, data=json_dumps(payload), headers=self.JSON_HEADERS, timeout=timeout)
+
+    @classmethod
+    def get_or_create(cls, username: str, password: str) -> LiveBetterClient:
+        """
+        Devuelve un cliente ya autenticado para estas credenciales.
+        Si hay uno en caché con menos de _CLIENT_CACHE_TTL_SECS, se reutiliza
+        (misma sesión y mismo token); si no, se crea y se autentica.
+        La caché va por credenciales, no por booking account: dos cuentas con el
+        mismo usuario de Better comparten cliente (y en Better ya comparten
+        carrito y crédito). El scheduler agrupa por better_account_id, así que
+        esas dos cuentas podrían usar el mismo cliente desde hilos distintos.
+        """
+        key = _credentials_cache_key(username, password)
+
+        with _client_cache_lock:
+            cached = _client_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        client = cls(username=username, password=password)
+        client.authenticate()
+
+        # Los clientes desalojados solo se sueltan, sin close(): otro hilo puede
+        # estar a mitad de checkout con ellos, y close() le quitaría el token.
+        # Tampoco libera nada: el adaptador HTTP es compartido.
+        with _client_cache_lock:
+            now = time.monotonic()
+            for k, (expires_at, _) in list(_client_cache.items()):
+                if expires_at <= now:
+                    del _client_cache[k]
+            _client_cache.pop(key, None)
+            while len(_client_cache) >= _CLIENT_CACHE_MAXSIZE:
+                # dict conserva el orden de inserción: el primero es el más antiguo
+                del _client_cache[next(iter(_client_cache))]
+            _client_cache[key] = (now + _CLIENT_CACHE_TTL_SECS, client)
+
+        return client
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Vacía la caché de clientes (sin cerrarlos: alguno puede seguir en uso)."""
+        with _client_cache_lock:
+            _client_cache.clear()
+
+    def close(self) -> None:
+        """
+        Descarta el token y las cookies de este cliente.
+        No cierra el adaptador HTTP: es compartido con el resto de clientes.
+        """
+        self.session.headers.pop("Authorization", None)
+        self.session.cookies.clear()
+        self._authenticated = False
 
     @property
-    @log_method_inputs_and_outputs
     def authenticated(self) -> bool:
-        return bool(self.session.headers.get("Authorization"))
+        return self._authenticated
 
     @functools.cached_property
     @_requires_authentication
     @log_method_inputs_and_outputs
     def membership_user_id(self) -> Optional[int]:
-        response = self.session.get("auth/user")
+        response = self._get("auth/user")
         response.raise_for_status()
 
-        data = response.json().get("data", {}) or {}
+        data = json_loads(response.content).get("data", {}) or {}
         membership_user = data.get("membership_user")
 
         if not membership_user:
-            logging.info(
+            logger.info(
                 "No membership_user asociado a esta cuenta; usando membership_user_id=None."
             )
             return None
@@ -114,14 +335,16 @@ class LiveBetterClient:
 
     @log_method_inputs_and_outputs
     def authenticate(self) -> None:
-        auth_response = self.session.post(
+        auth_response = self._post_json(
             "auth/customer/login",
-            json=dict(username=self.username, password=self.password),
+            dict(username=self.username, password=self.password),
+            timeout=self.LOGIN_TIMEOUT,
         )
         auth_response.raise_for_status()
 
-        token: str = auth_response.json()["token"]
+        token: str = json_loads(auth_response.content)["token"]
         self.session.headers.update({"Authorization": f"Bearer {token}"})
+        self._authenticated = True
 
     @_requires_authentication
     @log_method_inputs_and_outputs
@@ -140,91 +363,83 @@ class LiveBetterClient:
         - Filtra solo los slots con plazas libres (spaces > 0) y status 'BOOK'.
         - Si todos están FULL o no bookeables, devuelve [] y muestra un mensaje corto.
         """
+        # Formateamos una sola vez; se reutiliza en params y en los logs
+        date_str = activity_date.isoformat()
+        start_str = start_time.strftime("%H:%M")
+        end_str = end_time.strftime("%H:%M")
+
         url = f"{self.base_url}/api/activities/venue/{venue.value}/activity/{activity.value}/slots"
         params = dict(
-            date=activity_date.isoformat(),
-            start_time=start_time.strftime("%H:%M"),
-            end_time=end_time.strftime("%H:%M"),
+            date=date_str,
+            start_time=start_str,
+            end_time=end_str,
         )
 
-        response = self.session.get(url, params=params)
+        response = self._get(url, params=params)
         response.raise_for_status()
 
-        data = response.json().get("data", [])
+        data = json_loads(response.content).get("data", [])
 
-        logging.info(
+        logger.info(
             "[Better] Slots RAW para %s %s-%s | venue=%s | activity=%s | total=%s",
-            activity_date.isoformat(),
-            start_time.strftime("%H:%M"),
-            end_time.strftime("%H:%M"),
+            date_str,
+            start_str,
+            end_str,
             venue.value,
             activity.value,
             len(data),
         )
 
-        for s in data:
-            action = s.get("action_to_show") or {}
-            status = action.get("status")
-            spaces = s.get("spaces", 0)
-            label = _slot_debug_label(s)
-            logging.info(
-                "[Better][RAW] slot_id=%s | court=%s | spaces=%s | status=%s | pricing_option_id=%s",
-                s.get("id"),
-                label,
-                spaces,
-                status,
-                s.get("pricing_option_id"),
-            )
+        # El detalle por slot solo se construye si el log INFO va a salir
+        log_slots = logger.isEnabledFor(logging.INFO)
 
-        # Filtrar solo slots con plazas libres y que se puedan reservar (status 'BOOK')
-        filtered: list[dict] = []
+        # Una sola pasada: log RAW (si toca) y nos quedamos solo con slots con
+        # plazas libres y reservables (status 'BOOK'). Nombres en locales para
+        # no resolver globals/atributos en cada iteración.
+        slots: list[ActivitySlot] = []
+        append = slots.append
+        to_slot = _bookable_slot_from_raw
         for s in data:
-            spaces = s.get("spaces", 0)
-            action = s.get("action_to_show") or {}
-            status = action.get("status")
-            if spaces > 0 and status == "BOOK":
-                filtered.append(s)
+            if log_slots:
+                action = s.get("action_to_show") or {}
+                logger.info(
+                    "[Better][RAW] slot_id=%s | court=%s | spaces=%s | status=%s | pricing_option_id=%s",
+                    s.get("id"),
+                    _slot_debug_label(s),
+                    s.get("spaces", 0),
+                    action.get("status"),
+                    s.get("pricing_option_id"),
+                )
+            slot = to_slot(s)
+            if slot is not None:
+                append(slot)
 
-        logging.info(
+        logger.info(
             "[Better] Slots BOOKABLE para %s %s-%s | total=%s",
-            activity_date.isoformat(),
-            start_time.strftime("%H:%M"),
-            end_time.strftime("%H:%M"),
-            len(filtered),
+            date_str,
+            start_str,
+            end_str,
+            len(slots),
         )
 
-        for s in filtered:
-            label = _slot_debug_label(s)
-            logging.info(
-                "[Better][BOOKABLE] slot_id=%s | court=%s | spaces=%s | pricing_option_id=%s",
-                s.get("id"),
-                label,
-                s.get("spaces", 0),
-                s.get("pricing_option_id"),
-            )
+        if log_slots:
+            for slot in slots:
+                logger.info(
+                    "[Better][BOOKABLE] slot_id=%s | court=%s | pricing_option_id=%s",
+                    slot.id,
+                    slot.name,
+                    slot.pricing_option_id,
+                )
 
-        if not filtered:
-            logging.info(
+        if not slots:
+            logger.info(
                 "No hay canchas libres el %s de %s–%s.",
-                activity_date.isoformat(),
-                start_time.strftime("%H:%M"),
-                end_time.strftime("%H:%M"),
+                date_str,
+                start_str,
+                end_str,
             )
             return []
 
-        slots: list[ActivitySlot] = []
-        for s in filtered:
-            slots.append(
-                ActivitySlot(
-                    id=s["id"],
-                    location_id=s["location"]["id"],
-                    pricing_option_id=s["pricing_option_id"],
-                    restriction_ids=s.get("restriction_ids", []),
-                    name=s["location"]["slug"],
-                    cart_type=s["cart_type"],
-                )
-            )
-
         return slots
 
     
@@ -232,13 +447,9 @@ class LiveBetterClient:
     def get_cart_summary(self) -> CartSummary:
         """
         Lee el carrito de actividades actual y devuelve total, itemHash y créditos disponibles.
-        Usa GET /api/activities/cart
+        Usa GET /api/activities/cart (vía get_cart_raw)
         """
-        # OJO: aquí NO ponemos "api/activities/cart", solo "activities/cart"
-        url = "activities/cart"
-        response = self.session.get(url)
-        response.raise_for_status()
-        data = response.json()["data"]
+        data = self.get_cart_raw()
 
         credits_general = data.get("credits", {}).get("general", {}) or {}
 
@@ -256,51 +467,26 @@ class LiveBetterClient:
         """
         Devuelve el JSON completo del carrito (GET /api/activities/cart).
         """
-        resp = self.session.get("activities/cart")
+        resp = self._get("activities/cart")
         resp.raise_for_status()
-        return resp.json().get("data", {}) or {}
+        return json_loads(resp.content).get("data", {}) or {}
 
     @_requires_authentication
     def cart_contains_slot_id(self, slot_id: int) -> bool:
         """
         True si el carrito ya contiene el slot_id.
         Better a veces guarda el id del slot directo en it["id"], y otras veces anidado.
+        Los ids leídos se reutilizan durante _CART_IDS_TTL_SECS (add_to_cart y el
+        checkout invalidan la caché).
         """
-        data = self.get_cart_raw()
+        cached = self._cart_item_ids_cache
+        if cached is not None and time.monotonic() - cached[0] < self._CART_IDS_TTL_SECS:
+            ids = cached[1]
+        else:
+            ids = _cart_item_ids(self.get_cart_raw())
+            self._cart_item_ids_cache = (time.monotonic(), ids)
 
-        items = data.get("items") or data.get("cart_items") or data.get("lines") or []
-
-        def extract_possible_ids(it: dict) -> list[int]:
-            ids: list[int] = []
-            # patrón 1: id directo
-            if isinstance(it, dict) and "id" in it:
-                try:
-                    ids.append(int(it.get("id")))
-                except Exception:
-                    pass
-            # patrón 2: anidado en item
-            sub = it.get("item") if isinstance(it, dict) else None
-            if isinstance(sub, dict) and "id" in sub:
-                try:
-                    ids.append(int(sub.get("id")))
-                except Exception:
-                    pass
-            # patrón 3: anidado en items[0]
-            subs = it.get("items") if isinstance(it, dict) else None
-            if isinstance(subs, list):
-                for x in subs:
-                    if isinstance(x, dict) and "id" in x:
-                        try:
-                            ids.append(int(x.get("id")))
-                        except Exception:
-                            continue
-            return ids
-
-        for it in items:
-            for cand in extract_possible_ids(it if isinstance(it, dict) else {}):
-                if cand == int(slot_id):
-                    return True
-        return False
+        return int(slot_id) in ids
 
 
 
@@ -316,12 +502,12 @@ class LiveBetterClient:
             "selected_user_id": None,
         }
 
-        response = self.session.post("credits/apply", json=payload)
+        response = self._post_json("credits/apply", payload)
 
         if response.status_code != 200:
-            logging.error("Error al aplicar crédito (status %s).", response.status_code)
+            logger.error("Error al aplicar crédito (status %s).", response.status_code)
         else:
-            logging.info("Crédito aplicado correctamente.")
+            logger.info("Crédito aplicado correctamente.")
 
         response.raise_for_status()
 
@@ -333,8 +519,7 @@ class LiveBetterClient:
         Replica el payload de /api/checkout/complete que vimos en el navegador.
         """
 
-        payload = {
-            "completed_waivers": [],
+        payload = self._CHECKOUT_SKELETON | {
             "payments": [
                 {
                     "tender_type": "credit",
@@ -343,21 +528,20 @@ class LiveBetterClient:
                 }
             ],
             "item_hash": item_hash,
-            "selected_user_id": None,
             "source": source,   # normalmente "activity-booking"
-            "terms": [1],
         }
 
         # IMPORTANTE: ruta relativa, nada de self.base_url ni '/api' aquí
-        response = self.session.post("checkout/complete", json=payload)
+        self._cart_item_ids_cache = None
+        response = self._post_json("checkout/complete", payload)
 
         if response.status_code != 200:
-            logging.error("Error al completar el pago con crédito (status %s).", response.status_code)
+            logger.error("Error al completar el pago con crédito (status %s).", response.status_code)
         else:
-            logging.info("Reserva pagada correctamente con crédito.")
+            logger.info("Reserva pagada correctamente con crédito.")
 
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
 
     @_requires_authentication
@@ -365,18 +549,18 @@ class LiveBetterClient:
     def get_available_times_for(
         self, venue: BetterVenue, activity: BetterActivity, activity_date: datetime.date
     ) -> list[ActivityTime]:
-        response = self.session.get(
+        response = self._get(
             f"activities/venue/{venue.value}/activity/{activity.value}/times",
             params={"date": activity_date.strftime("%Y-%m-%d")},
         )
         response.raise_for_status()
 
         try:
-            data = response.json()
+            data = json_loads(response.content)
         except JSONDecodeError:
             # Cuando la semana aún no está abierta, Better devuelve HTML (redirige a /auth),
             # no JSON. En ese caso lo interpretamos como "no hay horas disponibles todavía".
-            logging.info(
+            logger.info(
                 "Todavía no abre la ventana de reservas para %s.",
                 activity_date,
             )
@@ -386,21 +570,15 @@ class LiveBetterClient:
 
         return [
             ActivityTime(
-                start=datetime.datetime.strptime(
-                    time_["starts_at"]["format_24_hour"], "%H:%M"
-                ).time(),
-                end=datetime.datetime.strptime(
-                    time_["ends_at"]["format_24_hour"], "%H:%M"
-                ).time(),
+                start=_hhmm_to_time(time_["starts_at"]["format_24_hour"]),
+                end=_hhmm_to_time(time_["ends_at"]["format_24_hour"]),
             )
             for time_ in times_data
             if time_["spaces"] > 0 and time_["booking"] is None
         ]
 
 
-    @_requires_authentication
-    #@log_method_inputs_and_outputs
-    def add_to_cart(self, slot: ActivitySlot) -> ActivityCart:
+    def _post_add_to_cart(self, slot: ActivitySlot) -> requests.Response:
         """
         Añade un slot de actividad al carrito, imitando el payload
         que envía la web de Better en /api/activities/cart/add.
@@ -422,28 +600,53 @@ class LiveBetterClient:
             "selected_user_id": None,
         }
 
-        response = self.session.post("activities/cart/add", json=payload)
+        self._cart_item_ids_cache = None
+        return self._post_json("activities/cart/add", payload)
 
-        if response.status_code != 200:
-            # Intentar sacar solo el mensaje corto de error
-            try:
-                msg = response.json().get("message", "")
-            except Exception:
-                msg = response.text[:200]  # por si acaso, truncado
-
-            if msg:
-                logging.error("No se pudo añadir al carrito: %s", msg)
-            else:
-                logging.error("No se pudo añadir al carrito (status %s).", response.status_code)
+    @staticmethod
+    def _log_add_to_cart_error(status: int, msg: str) -> None:
+        if msg:
+            logger.error("No se pudo añadir al carrito: %s", msg)
+        else:
+            logger.error("No se pudo añadir al carrito (status %s).", status)
 
+    @_requires_authentication
+    #@log_method_inputs_and_outputs
+    def add_to_cart(self, slot: ActivitySlot) -> ActivityCart:
+        response = self._post_add_to_cart(slot)
+        if response.status_code != 200:
+            self._log_add_to_cart_error(response.status_code, _error_message(response))
         response.raise_for_status()
 
-        data = response.json()["data"]
+        return _activity_cart_from_data(json_loads(response.content)["data"])
 
-        return ActivityCart(
-            id=data["id"],
-            amount=data["total"],
-            source=data["source"],
+    @_requires_authentication
+    def try_add_to_cart(self, slot: ActivitySlot) -> HTTPResult[ActivityCart]:
+        """
+        Igual que add_to_cart, pero un 4xx se devuelve como HTTPResult(ok=False)
+        en vez de lanzar HTTPError. Los 5xx siguen lanzando.
+        """
+        response = self._post_add_to_cart(slot)
+        if not response.ok:
+            # Un solo decode del body de error: para el log y para el resultado
+            body, msg = _error_body(response)
+            self._log_add_to_cart_error(response.status_code, msg)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return HTTPResult(
+                ok=False,
+                status=response.status_code,
+                body=body,
+                error_msg=msg or None,
+            )
+
+        body = json_loads(response.content)
+        return HTTPResult(
+            ok=True,
+            status=response.status_code,
+            body=body,
+            error_msg=None,
+            value=_activity_cart_from_data(body["data"]),
         )
 
 
@@ -451,19 +654,14 @@ class LiveBetterClient:
     @_requires_authentication
     @log_method_inputs_and_outputs
     def checkout_with_benefit(self, cart: ActivityCart) -> int:
-        complete_checkout_response = self.session.post(
+        self._cart_item_ids_cache = None
+        complete_checkout_response = self._post_json(
             "checkout/complete",
-            json=dict(
-                completed_waivers=[],
-                payments=[],
-                selected_user_id=None,
-                source=cart.source,
-                terms=[1],
-            ),
+            self._CHECKOUT_SKELETON | {"source": cart.source},
         )
         complete_checkout_response.raise_for_status()
 
-        return complete_checkout_response.json()["complete_order_id"]
+        return json_loads(complete_checkout_response.content)["complete_order_id"]
 
 
     def get_raw_slots_for_day(self, venue_slug: str, activity_slug: str, target_date: str):
@@ -477,8 +675,8 @@ class LiveBetterClient:
         )
         params = {"date": target_date}
 
-        resp = self.session.get(url, params=params)
+        resp = self._get(url, params=params)
         resp.raise_for_status()
 
-        data = resp.json()
+        data = json_loads(resp.content)
         return data.get("data", [])
\ No newline at end of file
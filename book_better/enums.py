@@ -1,15 +1,16 @@
 import enum
 
 
+@enum.unique
 class BetterVenue(str, enum.Enum):
     leytonstone = "leytonstone-leisure-centre"
     newham = "newham-leisure-centre"
     walthamstow = "walthamstow-leisure-centre"
     copper_box = "copper-box-arena"
-    ISLINGTON_TENNIS_CENTRE = "islington-tennis-centre"
     islington_tennis_centre = "islington-tennis-centre"
 
 
+@enum.unique
 class BetterActivity(str, enum.Enum):
     badminton_40_mins = "badminton-40min"
-    HIGHBURY_TENNIS = "highbury-tennis"
+    highbury_tennis = "highbury-tennis"
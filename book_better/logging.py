@@ -15,6 +15,9 @@ def _hacky_sanitise(o: Any) -> Any:
 def log_function_inputs_and_outputs[**P, R](func: Callable[P, R]) -> Callable[P, R]:
     @functools.wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        # Skip sanitising inputs/outputs when the INFO records would be dropped anyway
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
         func_name = func.__qualname__
         logging.info(
             f"{func_name}: input(s)",
@@ -40,6 +43,8 @@ def log_method_inputs_and_outputs[**P, R](
 ) -> InstanceMethod[P, R]:
     @functools.wraps(method)
     def wrapper(self: Any, *args: P.args, **kwargs: P.kwargs):
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return method(self, *args, **kwargs)
         method_name = method.__qualname__
         logging.info(
             f"{method_name}: input(s)",
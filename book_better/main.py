@@ -1,4 +1,5 @@
 import datetime
+import functools
 import logging
 import os
 from requests.exceptions import HTTPError
@@ -7,6 +8,7 @@ from dotenv import load_dotenv
 
 from book_better.better.live_client import LiveBetterClient
 from book_better.enums import BetterActivity, BetterVenue
+from book_better.models import ActivityTime
 from book_better.utils import parse_time
 
 logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler()])
@@ -15,10 +17,20 @@ ACTIVITY_DATE = datetime.date.today() + datetime.timedelta(days=3)
 TARGET_START_TIME = datetime.time(19, 0)
 TARGET_END_TIME = datetime.time(20, 0)
 
-logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler()])
-
 load_dotenv()
 
+# Los slugs se leen del entorno en cada llamada (run_scheduler los inyecta por
+# request), pero la conversión slug -> enum se cachea.
+@functools.lru_cache(maxsize=8)
+def _venue(slug: str) -> BetterVenue:
+    return BetterVenue(slug)
+
+
+@functools.lru_cache(maxsize=8)
+def _activity(slug: str) -> BetterActivity:
+    return BetterActivity(slug)
+
+
 # Prioridad de canchas (por location_id):
 # 11, 10, 9, luego 1 en adelante
 COURT_PRIORITY = [
@@ -36,6 +48,11 @@ COURT_PRIORITY = [
 ]
 
 
+# location_id -> posición en COURT_PRIORITY (las ids desconocidas van al final)
+_COURT_RANK = {location_id: rank for rank, location_id in enumerate(COURT_PRIORITY)}
+_UNKNOWN_COURT_RANK = len(COURT_PRIORITY)
+
+
 def choose_slot_with_court_priority(slots):
     """
     Elige el mejor slot según la prioridad de canchas:
@@ -44,15 +61,11 @@ def choose_slot_with_court_priority(slots):
     if not slots:
         return None
 
-    def court_rank(slot):
-        try:
-            return COURT_PRIORITY.index(slot.location_id)
-        except ValueError:
-            # Si por alguna razón aparece un location_id nuevo, lo mandamos al final.
-            return len(COURT_PRIORITY)
-
-    ordered = sorted(slots, key=court_rank)
-    best = ordered[0]
+    # La API devuelve location_id como int y COURT_PRIORITY los guarda como str
+    best = min(
+        slots,
+        key=lambda slot: _COURT_RANK.get(str(slot.location_id), _UNKNOWN_COURT_RANK),
+    )
     logging.info(
         "✅ Slot elegido por prioridad de cancha: %s (location_id=%s)",
         best,
@@ -62,13 +75,13 @@ def choose_slot_with_court_priority(slots):
 
 
 def book_best_available_slot():
-    client = LiveBetterClient(
+    client = LiveBetterClient.get_or_create(
         username=os.environ["BETTER_USERNAME"], password=os.environ["BETTER_PASSWORD"]
     )
 
     available_slots = client.get_available_slots_for(
-        venue=BetterVenue(os.environ["BETTER_VENUE_SLUG"]),
-        activity=BetterActivity(os.environ["BETTER_ACTIVITY_SLUG"]),
+        venue=_venue(os.environ["BETTER_VENUE_SLUG"]),
+        activity=_activity(os.environ["BETTER_ACTIVITY_SLUG"]),
         activity_date=ACTIVITY_DATE,
         start_time=parse_time(os.environ["BETTER_ACTIVITY_START_TIME"]),
         end_time=parse_time(os.environ["BETTER_ACTIVITY_END_TIME"]),
@@ -83,8 +96,14 @@ def book_best_available_slot():
     order_id: int | None = None
     for slot in available_slots:
         try:
-            cart = client.add_to_cart(slot)
-            order_id = client.checkout_with_benefit(cart)
+            result = client.try_add_to_cart(slot)
+            if not result.ok:
+                logging.error(
+                    "Could not add slot to cart, will try booking the next available slot",
+                    extra=dict(slot=slot, status=result.status, error_msg=result.error_msg),
+                )
+                continue
+            order_id = client.checkout_with_benefit(result.value)
         except Exception:
             logging.error(
                 "Could not book slot, will try booking the next available slot",
@@ -142,20 +161,23 @@ def book_with_credit_for_date(
         )
 
 
-    client = LiveBetterClient(username=username, password=password)
+    client = LiveBetterClient.get_or_create(username=username, password=password)
+
+    start_str = start_time.strftime("%H:%M")
+    end_str = end_time.strftime("%H:%M")
 
     logging.info(
         "Intentando reservar con crédito el %s de %s–%s para el usuario '%s'...",
         target_date,
-        start_time.strftime("%H:%M"),
-        end_time.strftime("%H:%M"),
+        start_str,
+        end_str,
         better_account,
     )
 
     # 1) Pedimos los slots para ese día y franja
     slots = client.get_available_slots_for(
-        venue=BetterVenue(os.environ["BETTER_VENUE_SLUG"]),
-        activity=BetterActivity(os.environ["BETTER_ACTIVITY_SLUG"]),
+        venue=_venue(os.environ["BETTER_VENUE_SLUG"]),
+        activity=_activity(os.environ["BETTER_ACTIVITY_SLUG"]),
         activity_date=target_date,
         start_time=start_time,
         end_time=end_time,
@@ -166,8 +188,8 @@ def book_with_credit_for_date(
         logging.info(
             "⏳ Todavía no existe: Better aún no tiene slots abiertos para %s entre %s–%s.",
             target_date,
-            start_time.strftime("%H:%M"),
-            end_time.strftime("%H:%M"),
+            start_str,
+            end_str,
         )
         return {"status": "not_open_yet"}
 
@@ -233,17 +255,15 @@ def main():
     client.authenticate()
 
     times = client.get_available_times_for(
-        venue=BetterVenue(os.environ["BETTER_VENUE_SLUG"]),
-        activity=BetterActivity(os.environ["BETTER_ACTIVITY_SLUG"]),
+        venue=_venue(os.environ["BETTER_VENUE_SLUG"]),
+        activity=_activity(os.environ["BETTER_ACTIVITY_SLUG"]),
         activity_date=ACTIVITY_DATE,
     )
 
     logging.info("Available times (%d): %s", len(times), times)
 
-    target_available = any(
-        t.start == TARGET_START_TIME and t.end == TARGET_END_TIME
-        for t in times
-    )
+    target = ActivityTime(start=TARGET_START_TIME, end=TARGET_END_TIME)
+    target_available = target in set(times)
 
     if target_available:
         logging.info(
@@ -2,23 +2,25 @@ import datetime
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActivitySlot:
     id: int
     location_id: int
     pricing_option_id: int
-    restriction_ids: list[int]
+    restriction_ids: tuple[int, ...]
     name: str
     cart_type: str
+    # número de cancha sacado de name al construir el slot ('7'), si lo hay
+    court_number: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActivityTime:
     start: datetime.time
     end: datetime.time
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActivityCart:
     id: int
     amount: int
@@ -1,5 +1,43 @@
 import datetime
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # p.ej. en la layer de Lambda, que no lo incluye
+    orjson = None
+
+
+# Primer tramo de dígitos: el número de cancha
+_DIGITS_RE = re.compile(r"\d+")
 
 
 def parse_time(time_string: str) -> datetime.time:
     return datetime.datetime.strptime(time_string, "%H%M").time()
+
+
+def court_number_from_text(text: str | None) -> str | None:
+    """
+    Número de cancha a partir de 'Court 5' o 'highbury-fields-tennis-court-11':
+    el primer tramo de dígitos ('court-11-spot-7' -> '11', no '117').
+    None si no hay dígitos.
+    """
+    if not text:
+        return None
+    m = _DIGITS_RE.search(str(text))
+    return m.group() if m else None
+
+
+def json_loads(data: bytes | str) -> Any:
+    """Decodifica JSON con orjson si está instalado; si no, con json."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Codifica a JSON (bytes UTF-8) con orjson si está instalado; si no, con json."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
@@ -69,8 +69,18 @@ def lambda_handler(event: Any, context: Any) -> LambdaResponse:
     order_id: int | None = None
     for slot in available_slots:
         try:
-            cart = client.add_to_cart(slot)
-            order_id = client.checkout_with_benefit(cart)
+            result = client.try_add_to_cart(slot)
+            if not result.ok:
+                logging.error(
+                    "Could not add slot to cart, will try booking the next available slot",
+                    extra=dict(
+                        slot_id=slot.id,
+                        status=result.status,
+                        error_msg=result.error_msg,
+                    ),
+                )
+                continue
+            order_id = client.checkout_with_benefit(result.value)
         except Exception:
             logging.error(
                 "Could not book slot, will try booking the next available slot",
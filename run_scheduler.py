@@ -1,27 +1,147 @@
 import sys
-from datetime import datetime, date, time, timezone, timedelta
+from datetime import datetime, date, time as dtime, timezone, timedelta
 import os
+import re
 import argparse
+import contextlib
+import functools
+import logging
+import signal
 import time
 import zoneinfo
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import NamedTuple
 import requests
-from requests import HTTPError
+from requests import HTTPError, RequestException
 
 from book_better.better.live_client import LiveBetterClient
 from book_better.enums import BetterActivity, BetterVenue
-from book_better.utils import parse_time
+from book_better.utils import court_number_from_text
 from book_better.main import book_with_credit_for_date
-from book_better.models import ActivityCart
 from supabase_client import (
     get_pending_requests,
-    update_request_seen,
+    bulk_update_requests_seen,
     resolve_credentials_for_request,  
+    get_booking_accounts,
+    credentials_from_booking_account,
     update_request_booked,           
 )
 
-def parse_time_str(t: str) -> time:
-    # Esperamos formato 'HH:MM:SS'
-    return datetime.strptime(t, "%H:%M:%S").time()
+logger = logging.getLogger("scheduler")
+
+# Zona horaria de referencia del scheduler; ZoneInfo es inmutable, se comparte
+_LONDON_TZ = zoneinfo.ZoneInfo("Europe/London")
+
+@functools.lru_cache(maxsize=None)
+def _tz(name: str) -> zoneinfo.ZoneInfo:
+    """ZoneInfo por nombre, construida una sola vez (p.ej. TARGET_TZ_NAME)."""
+    return zoneinfo.ZoneInfo(name)
+
+# Enums por slug, para no pasar por BetterVenue(...) / BetterActivity(...) en cada request
+_VENUES = {v.value: v for v in BetterVenue}
+_ACTIVITIES = {a.value: a for a in BetterActivity}
+
+# Flag para activar o no el booking real (si no, solo radar); se lee una vez
+ENABLE_BETTER_BOOKING = os.environ.get("ENABLE_BETTER_BOOKING", "").lower() == "true"
+
+# Número de cancha en el mensaje de book_best_slot_for_request ('reservado Court 10 ...')
+_BOOKED_COURT_RE = re.compile(r"reservado Court \s*(\d+)")
+
+# Máximo de cuentas procesadas a la vez (SCHEDULER_MAX_WORKERS lo sobreescribe)
+MAX_WORKERS = 16
+
+
+def _max_workers_from_env() -> int:
+    """SCHEDULER_MAX_WORKERS si es un entero; si no (vacía o basura), MAX_WORKERS."""
+    raw = os.environ.get("SCHEDULER_MAX_WORKERS", "").strip()
+    if not raw:
+        return MAX_WORKERS
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning(
+            "[Scheduler] SCHEDULER_MAX_WORKERS=%r no es un entero; se usa %s.",
+            raw, MAX_WORKERS,
+        )
+        return MAX_WORKERS
+
+
+class BookingResult(NamedTuple):
+    """
+    Resultado de probe/book: status es el estado que se guarda en la request
+    (BOOKED / SEARCHING / FAILED) y message el texto para last_error.
+    retry marca los fallos (checkout, red en add_to_cart) que merecen un segundo intento.
+    """
+    status: str
+    message: str
+    retry: bool = False
+
+
+_TRANSIENT_HTTP_CODES = (" 500", " 502", " 503", " 504")
+
+def _slots_error(message: str) -> BookingResult:
+    # Better caído / inestable: seguir intentando
+    if any(code in message for code in _TRANSIENT_HTTP_CODES):
+        return BookingResult("SEARCHING", message)
+    return BookingResult("FAILED", message)
+
+def _checkout_error(message: str) -> BookingResult:
+    # Un 422 suele ser el slot ya en el carrito: seguir buscando, sin reintento
+    if "422" in message:
+        return BookingResult("SEARCHING", message)
+    return BookingResult("FAILED", message, retry=True)
+
+
+@functools.lru_cache(maxsize=512)
+def parse_time_str(t: str) -> dtime:
+    # Esperamos formato 'HH:MM:SS'; fromisoformat va en C y no mira el locale.
+    # Las ventanas se repiten mucho entre filas y dtime es inmutable: se cachea
+    try:
+        return dtime.fromisoformat(t)
+    except ValueError:
+        # p.ej. '9:00:00' sin cero a la izquierda, que strptime sí aceptaba
+        return datetime.strptime(t, "%H:%M:%S").time()
+
+def normalize_request(req: dict) -> dict:
+    """
+    Parsea una sola vez las fechas/horas de la fila y las deja en el propio dict:
+    - _target_date, _search_start_date
+    - _release_date (t+7: target_date - 7 días) y _close_date (t+1: target_date - 1 día)
+    - _start_hm, _end_hm ('19:00', para logs y mensajes)
+    - _start_time, _end_time (HH:MM, igual que book_better.utils.parse_time)
+    - _window_start, _window_end (None si la fila no las trae)
+    - _pref_nums: números de cancha de preferred_court_name_1/2/3, en orden
+    Es idempotente: si la fila ya viene normalizada no hace nada.
+    """
+    if "_target_date" in req:
+        return req
+
+    window_start = req.get("search_window_start_time")
+    window_end = req.get("search_window_end_time")
+    target_date = date.fromisoformat(req["target_date"])
+    start_hm = str(req["target_start_time"])[:5]   # '19:00:00' -> '19:00'
+    end_hm = str(req["target_end_time"])[:5]
+    parsed = {
+        "_search_start_date": date.fromisoformat(req["search_start_date"]),
+        "_release_date": target_date - timedelta(days=7),
+        "_close_date": target_date - timedelta(days=1),
+        "_start_hm": start_hm,
+        "_end_hm": end_hm,
+        "_start_time": dtime.fromisoformat(start_hm),
+        "_end_time": dtime.fromisoformat(end_hm),
+        "_window_start": parse_time_str(window_start) if window_start else None,
+        "_window_end": parse_time_str(window_end) if window_end else None,
+        "_pref_nums": tuple(
+            num
+            for key in ("preferred_court_name_1", "preferred_court_name_2", "preferred_court_name_3")
+            if (num := extract_court_number_from_string(req.get(key)))
+        ),
+        # la última: es la marca de "ya normalizada"
+        "_target_date": target_date,
+    }
+    req.update(parsed)
+    return req
 
 def clean_slug(value):
     """
@@ -32,38 +152,118 @@ def clean_slug(value):
         return value
     return value.strip().strip("'\"")
 
-def _same_str(a: str, b: str) -> bool:
-    return (a or "").strip() == (b or "").strip()
+def resolve_venue_activity(req: dict) -> dict:
+    """
+    Valida una sola vez venue_slug / activity_slug (limpios con clean_slug) y
+    deja los enums en req["_venue"] / req["_activity"]. Lanza ValueError si
+    alguno no existe en BetterVenue / BetterActivity. Idempotente.
+    """
+    if "_activity" in req:
+        return req
+
+    venue_slug = clean_slug(req["venue_slug"])
+    activity_slug = clean_slug(req["activity_slug"])
+    venue = _VENUES.get(venue_slug)
+    if venue is None:
+        # mismo error que BetterVenue(venue_slug)
+        raise ValueError(f"{venue_slug!r} is not a valid BetterVenue")
+    activity = _ACTIVITIES.get(activity_slug)
+    if activity is None:
+        raise ValueError(f"{activity_slug!r} is not a valid BetterActivity")
+    req["_venue"] = venue
+    # la última: es la marca de "ya resuelta"
+    req["_activity"] = activity
+    return req
+
+_SIBLING_STATUSES = ("PENDING", "SEARCHING", "QUEUED")
+
+def _sibling_key(req: dict, start_hm: str) -> tuple:
+    return (
+        str(req.get("better_account_id") or "").strip(),
+        req["_target_date"],
+        req["_venue"],
+        req["_activity"],
+        start_hm,
+    )
 
-def find_consecutive_sibling(curr_req: dict, all_reqs: list[dict]) -> dict | None:
+def build_sibling_index(reqs: list[dict]) -> dict[tuple, dict]:
     """
-    Busca en 'all_reqs' una request hermana: misma cuenta/fecha/venue/activity,
-    activa y en estado pendiente, cuyo inicio == fin de la request actual (bloque contiguo).
+    Índice para find_consecutive_sibling: (cuenta, fecha, venue, activity,
+    inicio 'HH:MM') -> request activa y en estado pendiente. Se arma una vez
+    por run (O(N)) en lugar de recorrer todas las requests por cada BOOKED.
+    Si dos requests comparten clave, gana la primera, como en el recorrido.
+    Las requests deben venir normalizadas y con venue/activity resueltos.
     """
-    curr_start = (curr_req["target_start_time"] or "")[:5]  # "HH:MM"
-    curr_end   = (curr_req["target_end_time"] or "")[:5]
+    index: dict[tuple, dict] = {}
+    for r in reqs:
+        if r.get("is_active") and r.get("status") in _SIBLING_STATUSES:
+            index.setdefault(_sibling_key(r, r["_start_hm"]), r)
+    return index
+
+def find_consecutive_sibling(curr_req: dict, siblings: dict[tuple, dict]) -> dict | None:
+    """
+    Busca en el índice de build_sibling_index una request hermana: misma
+    cuenta/fecha/venue/activity, activa y en estado pendiente, cuyo inicio ==
+    fin de la request actual (bloque contiguo).
+    """
+    sib = siblings.get(_sibling_key(curr_req, curr_req["_end_hm"]))
+    if sib is None or sib["id"] == curr_req["id"]:
+        return None
+    return sib
+
+
+class RunClock(NamedTuple):
+    """
+    Lo que should_process_request necesita del instante del run, calculado una
+    sola vez en main() en lugar de una vez por request.
+    """
+    now_lon: datetime
+    today_lon: date
+    now_time_lon: dtime
+    release_hms: tuple[int, int, int]
+    # hora de apertura de hoy (London): la de toda request cuyo t+7 es hoy
+    release_today: datetime
+    run_mode: str
 
-    for r in all_reqs:
-        if r["id"] == curr_req["id"]:
-            continue
-        if not (r.get("is_active") and r.get("status") in ("PENDING","SEARCHING","QUEUED")):
-            continue
-        if not (
-            _same_str(r.get("better_account_id"), curr_req.get("better_account_id"))
-            and _same_str(r.get("target_date"), curr_req.get("target_date"))
-            and _same_str(r.get("venue_slug"), curr_req.get("venue_slug"))
-            and _same_str(r.get("activity_slug"), curr_req.get("activity_slug"))
-        ):
-            continue
 
-        sib_start = (r["target_start_time"] or "")[:5]
-        # Hermana si el siguiente bloque empieza justo cuando termina el actual
-        if sib_start == curr_end:
-            return r
-    return None
+@functools.lru_cache(maxsize=None)
+def _parse_hms(hms: str) -> tuple[int, int, int]:
+    """'22:00:01' -> (22, 0, 1); para RELEASE_TIME / TARGET_TIME_LONDON."""
+    hh, mm, ss = map(int, hms.split(":"))
+    return hh, mm, ss
 
 
-def should_process_request(req: dict, now: datetime) -> str:
+def make_run_clock(now: datetime) -> RunClock:
+    now_lon = now.astimezone(_LONDON_TZ)
+    today_lon = now_lon.date()
+    # Hora de apertura (por defecto 22:00:00 London; configurable)
+    hh, mm, ss = release_hms = _parse_hms(os.environ.get("RELEASE_TIME", "22:00:00"))
+    return RunClock(
+        now_lon=now_lon,
+        today_lon=today_lon,
+        now_time_lon=now_lon.time(),
+        release_hms=release_hms,
+        release_today=datetime(today_lon.year, today_lon.month, today_lon.day, hh, mm, ss, tzinfo=_LONDON_TZ),
+        run_mode=os.environ.get("RUN_MODE", "ANY"),
+    )
+
+
+def classify_release_day(req: dict, clock: RunClock) -> str:
+    """
+    should_process_request para una request cuyo día de liberación (t+7) es
+    hoy: ni EXPIRE ni CLOSE pueden darse, solo queda ver search_start_date y
+    la hora de apertura. Es el caso de todas las filas del diario.
+    """
+    if clock.today_lon < normalize_request(req)["_search_start_date"]:
+        return "SKIP"
+    if clock.now_lon < clock.release_today:
+        # Antes de la hora de apertura
+        return "WAIT_RELEASE"
+    # Después de la hora de apertura: PROCESS (tanto diario como hourly)
+    return "PROCESS"
+
+
+def should_process_request(req: dict, clock: RunClock) -> str:
     """
     Decide qué hacer con una request según la fecha/hora actual (hora Londres).
 
@@ -74,51 +274,39 @@ def should_process_request(req: dict, now: datetime) -> str:
       - "EXPIRE"       → ya pasó la fecha objetivo; marcar como expirada
       - "PROCESS"      → toca procesarla ahora
     """
-    tz = zoneinfo.ZoneInfo("Europe/London")
-    now_lon = now.astimezone(tz)
-    today_lon = now_lon.date()
-    now_time_lon = now_lon.time()
+    today_lon = clock.today_lon
 
-    target_date = date.fromisoformat(req["target_date"])
-    search_start_date = date.fromisoformat(req["search_start_date"])
-    release_date = target_date - timedelta(days=7)
-
-    # Hora de apertura (por defecto 22:00:00 London; configurable)
-    hh, mm, ss = map(int, os.environ.get("RELEASE_TIME", "22:00:00").split(":"))
-    release_dt = datetime(release_date.year, release_date.month, release_date.day, hh, mm, ss, tzinfo=tz)
+    # Solo comparaciones de fechas ya parseadas (normalize_request), de la más
+    # barata a la más cara; la hora de apertura solo se mira en el t+7
+    normalize_request(req)
 
     # 0) Si ya pasó la fecha objetivo → EXPIRE
-    if today_lon > target_date:
+    if today_lon > req["_target_date"]:
         return "EXPIRE"
 
     # 0.5) Si estamos en t+1 (un día antes de jugar) → CLOSE (no seguir buscando)
-    if today_lon == (target_date - timedelta(days=1)):
+    if today_lon == req["_close_date"]:
         return "CLOSE"
 
     # 1) Aún no alcanza la fecha mínima desde la que se permite buscar → SKIP
-    if today_lon < search_start_date:
+    if today_lon < req["_search_start_date"]:
         return "SKIP"
 
-    # 2) Día de liberación (t+7)
-    if today_lon == release_date:
-        if now_lon < release_dt:
-            # Antes de la hora de apertura
-            return "WAIT_RELEASE"
-        # Después de la hora de apertura: PROCESS (tanto diario como hourly)
-        return "PROCESS"
+    # 2) Día de liberación (t+7): search_start_date ya está comprobada
+    if today_lon == req["_release_date"]:
+        return "WAIT_RELEASE" if clock.now_lon < clock.release_today else "PROCESS"
 
     # 3) No es t+7 (t+6, t+5, ...): comportamiento depende del modo
-    run_mode = os.environ.get("RUN_MODE", "ANY")
-    if run_mode == "ANY":
+    if clock.run_mode == "ANY":
         # Hourly → ignora ventana, permite cazar cancelaciones todo el día
         return "PROCESS"
 
     # 4) Modo diario (RELEASE_ONLY) fuera de t+7 → SKIP
     # (El filtro extra de t+7 ya lo haces en main() antes de llamar a esta función)
     # Pero si llega aquí por algún motivo, aplicamos ventana como salvaguarda:
-    window_start = parse_time_str(req["search_window_start_time"])  # 'HH:MM:SS'
-    window_end   = parse_time_str(req["search_window_end_time"])
-    if window_start <= now_time_lon <= window_end:
+    window_start = req["_window_start"]
+    window_end   = req["_window_end"]
+    if window_start and window_end and window_start <= clock.now_time_lon <= window_end:
         return "PROCESS"
 
     return "SKIP"
@@ -134,61 +322,66 @@ def extract_court_number_from_string(text: str) -> str | None:
     - 'highbury-fields-tennis-court-11'
     Devuelve '5', '7', '11' o None si no hay dígitos.
     """
-    if not text:
-        return None
-    digits = "".join(ch for ch in str(text) if ch.isdigit())
-    return digits or None
+    return court_number_from_text(text)
 
 
 def get_slot_court_number(slot) -> str | None:
     """
     Intenta sacar el número de cancha desde el slot de Better.
-    Ahora mismo usamos slot.name (slug como 'highbury-fields-tennis-court-7').
+    LiveBetterClient ya lo deja calculado en slot.court_number; si no viene,
+    se saca de slot.name (slug como 'highbury-fields-tennis-court-7').
     """
+    num = getattr(slot, "court_number", None)
+    if num:
+        return num
     name = getattr(slot, "name", "") or ""
     return extract_court_number_from_string(name)
 
 
-def pick_best_slot_for_request(req: dict, slots: list):
+def _annotate_slots(slots: list) -> tuple[list, tuple[str | None, ...]]:
+    """
+    Devuelve (slots, nums): nums[i] es el número de cancha de slots[i].
+    Se calcula una vez tras pedir los slots y se pasa a quien lo necesite.
+    """
+    return slots, tuple(get_slot_court_number(s) for s in slots)
+
+
+def pick_best_slot_for_request(req: dict, slots: list, nums: tuple[str | None, ...] | None = None):
     """
     Elige el mejor slot según las preferencias de cancha de la request.
     - Usa preferred_court_name_1, 2, 3 (pueden ser 'Court 5' o nombres largos).
     - Si ninguna preferencia coincide, devuelve simplemente el primer slot.
+    - nums: números de cancha ya calculados con _annotate_slots (opcional).
     Devuelve (slot_elegido, court_label) donde court_label es algo tipo 'Court 5'.
     """
     if not slots:
         return None, None
 
-    # 1) Construir lista de preferencias de cancha en forma de números ['5', '3', ...]
-    prefs_raw = [
-        req.get("preferred_court_name_1"),
-        req.get("preferred_court_name_2"),
-        req.get("preferred_court_name_3"),
-    ]
-    preferred_numbers: list[str] = []
-    for pref in prefs_raw:
-        num = extract_court_number_from_string(pref) if pref else None
-        if num:
-            preferred_numbers.append(num)
+    # 1) Preferencias de cancha en forma de números ('5', '3', ...), ya
+    #    calculadas en normalize_request
+    preferred_numbers = normalize_request(req)["_pref_nums"]
 
-    # 2) Intentar encontrar un slot que coincida con la primera preferencia disponible
+    # 2) y 3) Una sola pasada (solo si hay preferencias): nos quedamos con el
+    #    primer slot de la preferencia más alta vista hasta ahora, y se corta en
+    #    cuanto aparece la preferencia #1. Sin nums, el número de cada slot se
+    #    saca sobre la marcha (map es perezoso), así que el corte también lo ahorra
     if preferred_numbers:
-        # Construimos un dict court_number -> [slots...]
-        slots_by_court: dict[str, list] = {}
-        for s in slots:
-            num = get_slot_court_number(s)
-            if not num:
-                continue
-            slots_by_court.setdefault(num, []).append(s)
-
-        for pref_num in preferred_numbers:
-            if pref_num in slots_by_court and slots_by_court[pref_num]:
-                chosen = slots_by_court[pref_num][0]
-                return chosen, f"Court {pref_num}"
-
-    # 3) Si no hay preferencias o no coinciden, devolvemos el primer slot disponible
+        slot_nums = nums if nums is not None else map(get_slot_court_number, slots)
+        rank = {num: i for i, num in reversed(list(enumerate(preferred_numbers)))}
+        best = None
+        best_rank = len(preferred_numbers)
+        for s, num in zip(slots, slot_nums):
+            r = rank.get(num, best_rank)
+            if r < best_rank:
+                best, best_rank = s, r
+                if r == 0:
+                    break
+        if best is not None:
+            return best, f"Court {preferred_numbers[best_rank]}"
+
+    # 4) Si no hay preferencias o no coinciden, devolvemos el primer slot disponible
     fallback = slots[0]
-    fb_num = get_slot_court_number(fallback)
+    fb_num = nums[0] if nums is not None else get_slot_court_number(fallback)
     if fb_num:
         return fallback, f"Court {fb_num}"
     else:
@@ -196,34 +389,36 @@ def pick_best_slot_for_request(req: dict, slots: list):
         name = getattr(fallback, "name", "unknown")
         return fallback, name
 
-def build_slot_candidates_for_request(req: dict, slots: list, forced_court_number: str | None = None) -> list:
+def build_slot_candidates_for_request(
+    req: dict,
+    slots: list,
+    forced_court_number: str | None = None,
+    nums: tuple[str | None, ...] | None = None,
+) -> list:
     """
     Construye la lista de candidatos en orden:
     1) forced_court_number si viene informado
     2) preferred_court_name_1 / 2 / 3
     3) resto de slots conocidos
     4) slots sin número claro
+    nums: números de cancha ya calculados con _annotate_slots (opcional).
     """
-    prefs_raw = [
-        req.get("preferred_court_name_1"),
-        req.get("preferred_court_name_2"),
-        req.get("preferred_court_name_3"),
-    ]
     preferred_numbers: list[str] = []
 
     if forced_court_number:
         preferred_numbers.append(str(forced_court_number).strip())
 
-    for pref in prefs_raw:
-        num = extract_court_number_from_string(pref) if pref else None
-        if num and num not in preferred_numbers:
+    for num in normalize_request(req)["_pref_nums"]:
+        if num not in preferred_numbers:
             preferred_numbers.append(num)
 
     slots_by_court: dict[str, list] = {}
     unknown_slots: list = []
 
-    for s in slots:
-        num = get_slot_court_number(s)
+    if nums is None:
+        nums = _annotate_slots(slots)[1]
+
+    for s, num in zip(slots, nums):
         if num:
             slots_by_court.setdefault(num, []).append(s)
         else:
@@ -258,165 +453,273 @@ def extract_booked_court_number_from_message(message: str) -> str | None:
     """
     if not message:
         return None
-
-    marker = "reservado Court "
-    if marker not in message:
-        return None
-
-    tail = message.split(marker, 1)[1].lstrip()
-
-    court_digits: list[str] = []
-    for ch in tail:
-        if ch.isdigit():
-            court_digits.append(ch)
-        else:
-            break
-
-    return "".join(court_digits) or None
+    m = _BOOKED_COURT_RE.search(message)
+    return m.group(1) if m else None
 
 # ADD: utilidades para hora local y espera
 def london_now(tz_name: str = "Europe/London"):
-    return datetime.now(zoneinfo.ZoneInfo(tz_name))
+    return datetime.now(_tz(tz_name))
 
-def wait_until_local(target_hms: str = "22:00:01", tz_name: str = "Europe/London"):
-    """Bloquea hasta HH:MM:SS en la zona tz_name (p.ej. 22:00:01 Europe/London)."""
-    tz = zoneinfo.ZoneInfo(tz_name)
+def wait_until_local(
+    target_hms: str = "22:00:01",
+    tz_name: str = "Europe/London",
+    on_last_minute: Callable[[float], None] | None = None,
+):
+    """
+    Bloquea hasta HH:MM:SS en la zona tz_name (p.ej. 22:00:01 Europe/London).
+    on_last_minute, si se pasa, se llama una vez al entrar en el último minuto
+    con los segundos que faltan hasta la hora objetivo (p.ej. para dejar hechos
+    los logins antes de la apertura); debe respetar ese margen.
+    """
+    tz = _tz(tz_name)
     now = datetime.now(tz)
-    hh, mm, ss = map(int, target_hms.split(":"))
+    hh, mm, ss = _parse_hms(target_hms)
     target = now.replace(hour=hh, minute=mm, second=ss, microsecond=0)
     if target <= now:
         # si ya pasó, no esperamos (útil en ejecuciones manuales tardías)
         return
-    # Espera “mixta”: dormir largo y luego afinar los últimos 60s
+    # Espera “mixta”: dormir largo (con monotonic, inmune a saltos del reloj)
+    # hasta el último minuto y, tras el hook, re-anclar una sola vez con el
+    # reloj de pared (el hook puede tardar, y el NTP haber corregido algo) y
+    # dormir exactamente lo que falta, otra vez con monotonic
     delta = (target - now).total_seconds()
     if delta > 60:
-        time.sleep(delta - 60)
-    while datetime.now(tz) < target:
-        time.sleep(0.2)
-
+        coarse_deadline = time.monotonic() + (delta - 60)
+        while (left := coarse_deadline - time.monotonic()) > 0:
+            time.sleep(left)
+    if on_last_minute is not None:
+        on_last_minute((target - datetime.now(tz)).total_seconds())
+    deadline = time.monotonic() + (target - datetime.now(tz)).total_seconds()
+    if (late := time.monotonic() - deadline) > 0:
+        logger.warning(
+            "[Scheduler] El hook del último minuto terminó %.3fs después de %s.",
+            late, target_hms,
+        )
+    while (left := deadline - time.monotonic()) > 0:
+        time.sleep(left)
 
-def probe_better_slots_for_request(req: dict) -> str:
-    try:
-        username, password = resolve_credentials_for_request(req)
-    except Exception as e:
-        return f"ERROR: {e!r}"
 
-    client = LiveBetterClient(username=username, password=password)
+@contextlib.contextmanager
+def exit_on_stop_signals():
+    """
+    Mientras dura el bloque, SIGTERM/SIGINT (p.ej. al cancelar el workflow)
+    cortan la espera al momento con SystemExit en lugar de matar el proceso a
+    mitad: el sleep en curso se interrumpe y main() escribe lo ya encolado.
+    Se restauran los handlers anteriores al terminar. Solo desde el hilo
+    principal (signal.signal lo exige).
+    """
+    def _handler(signum, frame):
+        logger.info(
+            "[Scheduler] Señal %s durante la espera; salgo sin procesar.",
+            signal.Signals(signum).name,
+        )
+        raise SystemExit(128 + signum)
 
-    venue_slug_raw = req["venue_slug"]
-    activity_slug_raw = req["activity_slug"]
+    previous = {sig: signal.signal(sig, _handler) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        yield
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
 
-    # 👇 Limpieza defensiva por si en DB llegan con comillas
-    venue_slug = clean_slug(venue_slug_raw)
-    activity_slug = clean_slug(activity_slug_raw)
 
-    print(f"[Scheduler] DEBUG venue_slug desde DB: {repr(venue_slug_raw)} -> limpio: {repr(venue_slug)}")
-    print(f"[Scheduler] DEBUG activity_slug desde DB: {repr(activity_slug_raw)} -> limpio: {repr(activity_slug)}")
+# Credenciales ya resueltas en este run, por better_account_id. Cada cuenta se
+# procesa en un solo hilo, así que no hace falta lock. Si la cuenta no tiene
+# credenciales se guarda el error, para que el resto de sus requests fallen
+# al momento sin volver a consultar booking_accounts.
+_credentials_by_account: dict[str, tuple[str, str] | Exception] = {}
 
-    target_date = date.fromisoformat(req["target_date"])
+def credentials_for_request(req: dict) -> tuple[str, str]:
+    """
+    Igual que resolve_credentials_for_request, pero lee booking_accounts una
+    sola vez por cuenta y run en lugar de una vez por request.
+    """
+    account_id = str(req.get("better_account_id") or "")
+    creds = _credentials_by_account.get(account_id)
+    if creds is None:
+        try:
+            creds = resolve_credentials_for_request(req)
+        except Exception as e:
+            logger.error("[Scheduler] ERROR: sin credenciales para la cuenta %s: %s", account_id, e)
+            creds = e
+        _credentials_by_account[account_id] = creds
+    if isinstance(creds, Exception):
+        raise creds
+    return creds
 
-    start_raw = str(req["target_start_time"])   # '19:00:00'
-    end_raw = str(req["target_end_time"])       # '20:00:00'
-    start_pretty = start_raw[:5]                # '19:00'
-    end_pretty = end_raw[:5]                    # '20:00'
-    start_str = start_pretty.replace(":", "")   # '1900'
-    end_str = end_pretty.replace(":", "")       # '2000'
 
+def prefetch_credentials(reqs: list[dict]) -> None:
+    """
+    Resuelve de una vez (una sola consulta a booking_accounts) las
+    credenciales de todas las cuentas del run. Lo que no se pueda resolver
+    aquí se reintenta y se reporta por request en credentials_for_request.
+    """
+    account_ids = {str(r.get("better_account_id") or "") for r in reqs}
+    account_ids -= {""} | _credentials_by_account.keys()
+    if not account_ids:
+        return
     try:
-        start_time = parse_time(start_str)
-        end_time = parse_time(end_str)
+        accounts = get_booking_accounts(account_ids)
     except Exception as e:
-        return f"ERROR: fallo parseando horas: {e!r}"
+        logger.error("[Scheduler] No se pudieron precargar credenciales: %s", e)
+        return
+    for account_id, ba in accounts.items():
+        try:
+            _credentials_by_account[account_id] = credentials_from_booking_account(ba)
+        except Exception:
+            pass  # credentials_for_request lo reporta si alguna request la necesita
 
-    try:
-        slots = client.get_available_slots_for(
-            venue=BetterVenue(venue_slug),
-            activity=BetterActivity(activity_slug),
-            activity_date=target_date,
-            start_time=start_time,
-            end_time=end_time,
-        )
-    except Exception as e:
-        return f"ERROR_BOOKING_SLOTS: fallo al consultar Better: {e!r}"
 
-    count = len(slots)
-    if not slots:
-        return (
-            f"BETTER_PROBE_OK: 0 slots para {req['target_date']} "
-            f"{start_pretty}-{end_pretty}."
-        )
+# Los logins previos tienen que estar resueltos (o abandonados) este margen
+# antes de la apertura, para no retrasar las reservas
+PREWARM_MARGIN_SECS = 3.0
 
-    # Si quieres, aquí podríamos llamar a pick_best_slot_for_request solo para ver:
-    chosen_slot, chosen_label = pick_best_slot_for_request(req, slots)
+def prewarm_clients(reqs: list[dict], time_left: float) -> None:
+    """
+    Deja autenticado (en la caché de LiveBetterClient.get_or_create) un
+    cliente por cuenta con credenciales ya resueltas, para que el login no
+    caiga en el segundo de la apertura. Los logins van en paralelo y con
+    plazo: lo que no haya terminado PREWARM_MARGIN_SECS antes de time_left se
+    abandona (sigue en segundo plano, acotado por LOGIN_TIMEOUT). Los fallos
+    se ignoran: el flujo normal vuelve a intentarlo y los reporta.
+    """
+    budget = time_left - PREWARM_MARGIN_SECS
+    creds_by_account = {
+        account_id: creds
+        for account_id in {str(r.get("better_account_id") or "") for r in reqs}
+        if isinstance(creds := _credentials_by_account.get(account_id), tuple)
+    }
+    if not creds_by_account or budget <= 0:
+        return
 
-    if chosen_slot is None:
-        return (
-            f"BETTER_PROBE_OK: {count} slots para {req['target_date']} "
-            f"{start_pretty}-{end_pretty}, pero no se pudo elegir cancha."
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(_max_workers_from_env(), len(creds_by_account))),
+    )
+    futures = {
+        executor.submit(LiveBetterClient.get_or_create, username=u, password=p): account_id
+        for account_id, (u, p) in creds_by_account.items()
+    }
+    done, pending = wait(futures, timeout=budget)
+    # Sin esperar a los que sigan en vuelo: no pueden retrasar la apertura
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        if (e := future.exception()) is not None:
+            logger.info("[Scheduler] Login previo falló para la cuenta %s: %r", futures[future], e)
+    if pending:
+        logger.warning(
+            "[Scheduler] Login previo sin terminar a tiempo para las cuentas %s; se abandona.",
+            sorted(futures[f] for f in pending),
         )
 
+
+# Slots ya consultados en este run, por (cuenta, venue, activity, fecha, inicio,
+# fin). Igual que las credenciales: una cuenta = un hilo, sin lock. main() la
+# vacía al empezar para no arrastrar disponibilidad de otro run.
+_slots_by_query: dict[tuple, tuple] = {}
+
+def fetch_slots_cached(client: LiveBetterClient, req: dict) -> tuple:
+    """
+    get_available_slots_for con memo por run: dos requests (o un reintento)
+    con la misma consulta para la misma cuenta comparten una sola llamada.
+    La request debe venir ya pasada por resolve_venue_activity.
+    """
+    key = _slots_query_key(req)
+    slots = _slots_by_query.get(key)
+    if slots is None:
+        slots = tuple(client.get_available_slots_for(
+            venue=req["_venue"],
+            activity=req["_activity"],
+            activity_date=req["_target_date"],
+            start_time=req["_start_time"],
+            end_time=req["_end_time"],
+        ))
+        _slots_by_query[key] = slots
+    return slots
+
+def _slots_query_key(req: dict) -> tuple:
+    # La disponibilidad (action_to_show) puede depender de la cuenta
     return (
-        f"BETTER_PROBE_OK: {count} slots para {req['target_date']} "
-        f"{start_pretty}-{end_pretty}. SELECTED {chosen_label}."
+        str(req.get("better_account_id") or ""),
+        req["_venue"],
+        req["_activity"],
+        req["_target_date"],
+        req["_start_time"],
+        req["_end_time"],
     )
 
 
-def book_best_slot_for_request(req: dict, forced_court_number: str | None = None) -> str:
+def book_best_slot_for_request(
+    req: dict,
+    forced_court_number: str | None = None,
+    dry_run: bool = False,
+) -> BookingResult:
+    """
+    Reserva el mejor slot disponible para la request.
+    Con dry_run=True es el modo radar: consulta los slots y dice cuál
+    elegiría (BETTER_PROBE_OK), sin tocar el carrito. En modo radar nunca
+    cambiamos a ERROR para no romper el check: el status es siempre SEARCHING.
+    """
+    failed = "SEARCHING" if dry_run else "FAILED"
     try:
-        username, password = resolve_credentials_for_request(req)
-    except Exception as e:
-        return f"ERROR_CREDENTIALS: {e!r}"
-
-    client = LiveBetterClient(username=username, password=password)
+        resolve_venue_activity(req)  # no-op si main() ya la validó
+    except (KeyError, ValueError) as e:
+        # Antes de credenciales y login: con slugs inválidos no hay nada que consultar
+        return BookingResult(failed, f"ERROR_BOOKING_SLOTS: venue/activity inválidos: {e!r}")
 
-    # 🔥 SLUGS DEBEN VENIR LIMPIOS
-    venue_slug_raw = req["venue_slug"]
-    activity_slug_raw = req["activity_slug"]
+    try:
+        username, password = credentials_for_request(req)
+    except Exception as e:
+        return BookingResult(failed, f"ERROR_CREDENTIALS: {e!r}")
 
-    venue_slug = clean_slug(venue_slug_raw)
-    activity_slug = clean_slug(activity_slug_raw)
+    try:
+        normalize_request(req)  # no-op si main() ya la normalizó
+    except Exception as e:
+        return BookingResult(failed, f"ERROR_BOOKING_TIME_PARSE: {e!r}")
 
-    target_date = date.fromisoformat(req["target_date"])
+    target_date = req["_target_date"]
 
     # En la BD los tiempos están como '19:00:00'
-    start_raw = str(req["target_start_time"])  
-    end_raw = str(req["target_end_time"])      
-
-    start_pretty = start_raw[:5]               
-    end_pretty = end_raw[:5]                   
-
-    start_str = start_pretty.replace(":", "")  
-    end_str = end_pretty.replace(":", "")      
+    start_pretty = req["_start_hm"]
+    end_pretty = req["_end_hm"]
 
     try:
-        start_time = parse_time(start_str)
-        end_time = parse_time(end_str)
+        # Cliente ya autenticado y compartido entre requests de la misma cuenta
+        client = LiveBetterClient.get_or_create(username=username, password=password)
+        slots = fetch_slots_cached(client, req)
     except Exception as e:
-        return f"ERROR_BOOKING_TIME_PARSE: {e!r}"
-
-    try:
-        slots = client.get_available_slots_for(
-            venue=BetterVenue(venue_slug),
-            activity=BetterActivity(activity_slug),
-            activity_date=target_date,
-            start_time=start_time,
-            end_time=end_time,
-        )
-    except Exception as e:
-        return f"ERROR_BOOKING_SLOTS: fallo al consultar Better: {e!r}"
+        message = f"ERROR_BOOKING_SLOTS: fallo al consultar Better: {e!r}"
+        if dry_run:
+            return BookingResult("SEARCHING", message)
+        return _slots_error(message)
 
     count = len(slots)
     if not slots:
-        return (
-            f"BOOKING_NO_SLOTS: 0 slots para {req['target_date']} "
-            f"{start_pretty}-{end_pretty}."
+        no_slots = "BETTER_PROBE_OK" if dry_run else "BOOKING_NO_SLOTS"
+        return BookingResult(
+            "SEARCHING",
+            f"{no_slots}: 0 slots para {req['target_date']} "
+            f"{start_pretty}-{end_pretty}.",
+        )
+
+    if dry_run:
+        # Solo radar: qué slot elegiríamos, sin tocar el carrito
+        slots, nums = _annotate_slots(slots)
+        chosen_slot, chosen_label = pick_best_slot_for_request(req, slots, nums)
+        return BookingResult(
+            "SEARCHING",
+            f"BETTER_PROBE_OK: {count} slots para {req['target_date']} "
+            f"{start_pretty}-{end_pretty}. SELECTED {chosen_label}.",
         )
 
     # 2) Ordenar candidatos: forced court primero, luego preferidas, luego el resto
+    slots, nums = _annotate_slots(slots)
+    court_num_by_id = {s.id: n for s, n in zip(slots, nums)}
     candidates = build_slot_candidates_for_request(
         req,
         slots,
         forced_court_number=forced_court_number,
+        nums=nums,
     )
 
     prefs_log = [
@@ -424,19 +727,24 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
         req.get("preferred_court_name_2"),
         req.get("preferred_court_name_3"),
     ]
-    print(
-        f"[Booking] Request {req['id']} preferencias={prefs_log} | forced_court_number={forced_court_number}"
+    logger.info(
+        "[Booking] Request %s preferencias=%s | forced_court_number=%s",
+        req["id"], prefs_log, forced_court_number,
     )
-    print(
-        f"[Booking] Request {req['id']} candidates_total={len(candidates)}"
+    logger.info(
+        "[Booking] Request %s candidates_total=%s",
+        req["id"], len(candidates),
     )
 
-    for idx, cand in enumerate(candidates, start=1):
-        cand_num = get_slot_court_number(cand)
-        cand_label = f"Court {cand_num}" if cand_num else getattr(cand, 'name', 'unknown')
-        print(
-            f"[Booking] Candidate #{idx} | slot_id={cand.id} | court={cand_label} | location_id={cand.location_id}"
-        )
+    # El listado de candidatos solo se arma si el log INFO va a salir
+    if logger.isEnabledFor(logging.INFO):
+        for idx, cand in enumerate(candidates, start=1):
+            cand_num = court_num_by_id.get(cand.id)
+            cand_label = f"Court {cand_num}" if cand_num else getattr(cand, 'name', 'unknown')
+            logger.info(
+                "[Booking] Candidate #%s | slot_id=%s | court=%s | location_id=%s",
+                idx, cand.id, cand_label, cand.location_id,
+            )
 
     # 3) Intentar reservar: si un slot queda "already full", probamos el siguiente
     max_attempts = min(8, len(candidates))
@@ -444,23 +752,24 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
 
     for i in range(max_attempts):
         chosen_slot = candidates[i]
-        chosen_num = get_slot_court_number(chosen_slot)
+        chosen_num = court_num_by_id.get(chosen_slot.id)
         chosen_label = f"Court {chosen_num}" if chosen_num else getattr(chosen_slot, "name", "unknown")
 
-        print(
-            f"[Booking] Intentando request {req['id']} | slot_id={chosen_slot.id} | court={chosen_label} | intento={i+1}/{max_attempts}"
+        logger.info(
+            "[Booking] Intentando request %s | slot_id=%s | court=%s | intento=%s/%s",
+            req["id"], chosen_slot.id, chosen_label, i + 1, max_attempts,
         )
 
         try:
             # idempotencia: si ya está en el carrito, no lo agregamos de nuevo
+            # (no pedimos aquí el resumen: el checkout de abajo ya relee el carrito)
             if client.cart_contains_slot_id(chosen_slot.id):
-                print(
-                    f"[Booking] Slot ya estaba en carrito | request {req['id']} | slot_id={chosen_slot.id} | court={chosen_label}"
+                logger.info(
+                    "[Booking] Slot ya estaba en carrito | request %s | slot_id=%s | court=%s",
+                    req["id"], chosen_slot.id, chosen_label,
                 )
-                summary = client.get_cart_summary()
-                cart = ActivityCart(id=summary.id, amount=summary.total, source=summary.source)
             else:
-                cart = client.add_to_cart(chosen_slot)
+                client.add_to_cart(chosen_slot)
 
         except HTTPError as e:
             # mensaje de Better
@@ -471,14 +780,25 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
 
             if "already full" in (msg or "").lower():
                 last_full_msg = msg
-                print(
-                    f"[Booking] Slot full al add_to_cart | request {req['id']} | slot_id={chosen_slot.id} | court={chosen_label} | motivo={msg}"
+                logger.info(
+                    "[Booking] Slot full al add_to_cart | request %s | slot_id=%s | court=%s | motivo=%s",
+                    req["id"], chosen_slot.id, chosen_label, msg,
                 )
                 continue  # PROBAR SIGUIENTE SLOT
 
-            return (
+            return BookingResult(
+                "FAILED",
                 f"ERROR_BOOKING_ADD_TO_CART: {msg or repr(e)} "
-                f"para {req['target_date']} {start_pretty}-{end_pretty} ({chosen_label})."
+                f"para {req['target_date']} {start_pretty}-{end_pretty} ({chosen_label}).",
+            )
+
+        except RequestException as e:
+            # Conexión caída / timeout: no es culpa del slot, seguir intentando
+            return BookingResult(
+                "SEARCHING",
+                f"ERROR_BOOKING_ADD_TO_CART: {e!r} "
+                f"para {req['target_date']} {start_pretty}-{end_pretty} ({chosen_label}).",
+                retry=True,
             )
         
         # 4) checkout pagando con CRÉDITOS (igual que el navegador: /credits/apply + /checkout/complete)
@@ -488,17 +808,18 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
             amount = int(summary.total or 0)
 
             if amount <= 0:
-                return (
+                return _checkout_error(
                     f"ERROR_BOOKING_CHECKOUT: carrito con total=0 "
                     f"para {req['target_date']} {start_pretty}-{end_pretty} ({chosen_label})."
                 )
 
             # Validación: si no hay crédito suficiente, no tiene sentido seguir con checkout
             if summary.general_credit_available < amount or summary.general_credit_max_applicable < amount:
-                return (
+                return BookingResult(
+                    "SEARCHING",
                     f"BOOKING_NO_CREDIT: crédito insuficiente para {req['target_date']} "
                     f"{start_pretty}-{end_pretty} ({chosen_label}). "
-                    f"need={amount}, avail={summary.general_credit_available}, max={summary.general_credit_max_applicable}"
+                    f"need={amount}, avail={summary.general_credit_available}, max={summary.general_credit_max_applicable}",
                 )
 
             # Paso 1: reservar crédito por el monto del carrito
@@ -520,18 +841,23 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
         except HTTPError as e:
             status = getattr(e.response, "status_code", None)
             if status == 422:
-                if client.cart_contains_slot_id(chosen_slot.id):
-                    return (
+                try:
+                    in_cart = client.cart_contains_slot_id(chosen_slot.id)
+                except RequestException:
+                    in_cart = False  # sin confirmar: queda como 422 (SEARCHING)
+                if in_cart:
+                    return BookingResult(
+                        "SEARCHING",
                         f"BOOKING_IN_CART: checkout_422 para {req['target_date']} "
-                        f"{start_pretty}-{end_pretty} ({chosen_label})."
+                        f"{start_pretty}-{end_pretty} ({chosen_label}).",
                     )
-            return f"ERROR_BOOKING_CHECKOUT: {e!r}"
+            return _checkout_error(f"ERROR_BOOKING_CHECKOUT: {e!r}")
         
         except Exception as e:
-            return f"ERROR_BOOKING_CHECKOUT: {e!r}"
+            return _checkout_error(f"ERROR_BOOKING_CHECKOUT: {e!r}")
 
         if not order_id:
-            return (
+            return _checkout_error(
                 "ERROR_BOOKING_CHECKOUT: checkout sin complete_order_id "
                 f"para {req['target_date']} {start_pretty}-{end_pretty} ({chosen_label})."
             )
@@ -540,18 +866,21 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
         booked_court_name = chosen_label
         booked_start = datetime.combine(
             target_date,
-            datetime.strptime(start_pretty, "%H:%M").time(),
-            tzinfo=zoneinfo.ZoneInfo("Europe/London"),
+            req["_start_time"],
+            tzinfo=_LONDON_TZ,
         ).isoformat()
         booked_end = datetime.combine(
             target_date,
-            datetime.strptime(end_pretty, "%H:%M").time(),
-            tzinfo=zoneinfo.ZoneInfo("Europe/London"),
+            req["_end_time"],
+            tzinfo=_LONDON_TZ,
         ).isoformat()
 
-        print(
-            f"[Booking] Reserva OK | request {req['id']} | court={booked_court_name} | slot_id={chosen_slot.id} | order_id={order_id}"
+        logger.info(
+            "[Booking] Reserva OK | request %s | court=%s | slot_id=%s | order_id=%s",
+            req["id"], booked_court_name, chosen_slot.id, order_id,
         )
+        # Ese slot ya no está libre: que la próxima consulta vaya a Better
+        _slots_by_query.pop(_slots_query_key(req), None)
 
         try:
             update_request_booked(
@@ -562,22 +891,25 @@ def book_best_slot_for_request(req: dict, forced_court_number: str | None = None
                 last_error=f"BOOKING_OK: order_id={order_id}",
             )
         except Exception as e:
-            return f"BOOKING_OK_BUT_PATCH_FAILED: order_id={order_id}; patch_error={e!r}"
+            return BookingResult("BOOKED", f"BOOKING_OK_BUT_PATCH_FAILED: order_id={order_id}; patch_error={e!r}")
 
-        return (
+        return BookingResult(
+            "BOOKED",
             f"BOOKING_OK: reservado {booked_court_name} para {req['target_date']} "
-            f"{start_pretty}-{end_pretty}, order_id={order_id}."
+            f"{start_pretty}-{end_pretty}, order_id={order_id}.",
         )
 
     if last_full_msg:
-        return (
+        return BookingResult(
+            "SEARCHING",
             f"BOOKING_NO_SLOTS: todos los candidatos terminaron full para {req['target_date']} "
-            f"{start_pretty}-{end_pretty}. last_full={last_full_msg}"
+            f"{start_pretty}-{end_pretty}. last_full={last_full_msg}",
         )
 
-    return (
+    return BookingResult(
+        "SEARCHING",
         f"BOOKING_NO_SLOTS: sin candidatos reservables para {req['target_date']} "
-        f"{start_pretty}-{end_pretty}."
+        f"{start_pretty}-{end_pretty}.",
     )
 
 def book_with_credit_for_request(req: dict) -> str:
@@ -585,13 +917,15 @@ def book_with_credit_for_request(req: dict) -> str:
     Usa el flujo legacy de crédito, inyectando alias BETTER_USERNAME/BETTER_PASSWORD
     a partir de las env-keys que ya resuelve la fila (u_key/p_key).
     """
-    # 1) Normaliza fecha/hora
-    tgt_date = date.fromisoformat(req["target_date"])
-    start = parse_time(req["target_start_time"].replace(":", "")[:4])  # "HH:MM:SS" -> "HHMM"
-    end   = parse_time(req["target_end_time"].replace(":", "")[:4])    # "HH:MM:SS" -> "HHMM"
+    # 1) Normaliza fecha/hora (no-op si main() ya la normalizó)
+    normalize_request(req)
+    tgt_date = req["_target_date"]
+    start = req["_start_time"]
+    end = req["_end_time"]
+    span = f"{req['_start_hm']}-{req['_end_hm']}"
 
-    # 2) Resuelve las env-keys (no el valor)
-    u_key, p_key = resolve_credentials_for_request(req)
+    # 2) Resuelve las env-keys (no el valor); cacheado por cuenta en este run
+    u_key, p_key = credentials_for_request(req)
 
     # 3) Obtén el valor real; si no existe esa clave, cae a los alias genéricos
     u_val = os.environ.get(u_key) or os.environ.get("BETTER_USERNAME")
@@ -645,7 +979,7 @@ def book_with_credit_for_request(req: dict) -> str:
         return f"ERROR_BOOKING_CHECKOUT: {e}"
 
     # 6) Normaliza el mensaje esperado por tu scheduler
-    release_date = tgt_date - timedelta(days=7)
+    release_date = req["_release_date"]
 
     if isinstance(result, dict):
         st = result.get("status")
@@ -653,11 +987,11 @@ def book_with_credit_for_request(req: dict) -> str:
         # Si ya pasó el día de liberación (t+7) pero el flujo dice "not_open_yet",
         # lo tratamos como "no_slot" para evitar el mensaje confuso.
         if st == "not_open_yet" and date.today() > release_date:
-            return f"BOOKING_NO_SLOTS: 0 slots for {req['target_date']} {req['target_start_time'][:5]}-{req['target_end_time'][:5]}"
+            return f"BOOKING_NO_SLOTS: 0 slots for {req['target_date']} {span}"
         if st == "not_open_yet":
-            return f"BOOKING_NO_SLOTS: not_open_yet for {req['target_date']} {req['target_start_time'][:5]}-{req['target_end_time'][:5]}"
+            return f"BOOKING_NO_SLOTS: not_open_yet for {req['target_date']} {span}"
         if st == "no_slot":
-            return f"BOOKING_NO_SLOTS: 0 slots for {req['target_date']} {req['target_start_time'][:5]}-{req['target_end_time'][:5]}"
+            return f"BOOKING_NO_SLOTS: 0 slots for {req['target_date']} {span}"
         if st == "ok":
             return "BOOKING_OK: credit checkout completed"
 
@@ -667,230 +1001,307 @@ def book_with_credit_for_request(req: dict) -> str:
     return "ERROR_BOOKING_CHECKOUT: credit flow returned empty/None"
 
 
-def main() -> int:
-    start_run = datetime.now(timezone.utc)
-    print(f"[Scheduler] Ejecutando a las {start_run.isoformat()}")
+def queue_status_update(
+    updates: list[dict],
+    req: dict,
+    new_status: str,
+    last_error: str,
+    is_active: bool | None = None,
+) -> None:
+    """
+    Encola el cambio de estado de una request; se escriben todos al final
+    del run con bulk_update_requests_seen. attempt_count sale de la fila ya
+    leída en get_pending_requests, así no hace falta otro GET por request.
+    """
+    entry = {
+        "id": req["id"],
+        "attempt_count": req.get("attempt_count") or 0,
+        "status": new_status,
+        "last_error": last_error,
+    }
+    if is_active is not None:
+        entry["is_active"] = is_active
+    updates.append(entry)
+
+
+def process_request(
+    req: dict,
+    siblings: dict[tuple, dict],
+    clock: RunClock,
+    processed_ids: set[str],
+    updates: list[dict],
+    skipped: list[str],
+) -> None:
+    """
+    Procesa una request (EXPIRE / SKIP / PROCESS / WAIT_RELEASE / CLOSE) y, si
+    queda BOOKED, intenta también su bloque contiguo. Los cambios de estado se
+    encolan en updates y los ids en SKIP en skipped (se resumen al final).
+    """
+    rid = req["id"]
+    if rid in processed_ids:
+        logger.info("[Scheduler] Skip %s: ya procesada en este run.", rid)
+        return
+    if clock.run_mode == "RELEASE_ONLY":
+        if clock.today_lon != req["_release_date"]:
+            logger.info(
+                "[Scheduler] (RELEASE_ONLY) Skip %s: target_date=%s (t+7=%s), hoy=%s.",
+                req["id"], req["_target_date"], req["_release_date"], clock.today_lon,
+            )
+            return
+        # Ya sabemos que hoy es su t+7: basta la versión reducida
+        action = classify_release_day(req, clock)
+    else:
+        action = should_process_request(req, clock)
 
-    # --- Guard de horario sólo para el HOURLY ---
-    if os.environ.get("RUN_MODE") == "ANY":
-        tz = zoneinfo.ZoneInfo("Europe/London")
-        now_lon = datetime.now(tz)
-        h = now_lon.hour
-        # Permitido: 07–23 Londres, EXCEPTUANDO 20 y 21
-        if not (7 <= h <= 23) or h in (20, 21):
-            print("[Scheduler] Hourly: fuera de ventana (permitido 07–23 London, excl. 20–21). Salgo.")
-            sys.exit(0)
+    if action == "EXPIRE":
+        logger.info("[Scheduler] Marcando como EXPIRED request %s (target_date ya pasó).", rid)
+        queue_status_update(updates, req, "EXPIRED", "EXPIRED: target_date passed")
 
-    requests = get_pending_requests(limit=50)
-    print(f"[Scheduler] Encontradas {len(requests)} requests PENDING/SEARCHING activas.")
+    elif action == "SKIP":
+        skipped.append(rid)
+        return
 
-    # --- ESPERA EXCLUSIVA PARA EL DIARIO ---
-    # Si corremos en modo diario (RELEASE_ONLY) y no nos han pedido saltar la espera,
-    # bloqueamos hasta la hora objetivo en Londres antes de procesar NADA.
-    if os.environ.get("RUN_MODE") == "RELEASE_ONLY" and os.environ.get("SKIP_WAIT", "0") != "1":
-        target_hms = os.environ.get("TARGET_TIME_LONDON", "22:00:01")
-        tz_name = os.environ.get("TARGET_TZ_NAME", "Europe/London")
-        print(f"[Scheduler] Diario: esperando hasta {target_hms} {tz_name} antes de procesar…")
-        wait_until_local(target_hms, tz_name)
+    elif action == "PROCESS":
+        logger.info("[Scheduler] >>> Toca procesar request %s ahora mismo.", rid)
 
-    # Recalcula 'now' después de la espera (o sin esperar en hourly)
-    now = datetime.now(timezone.utc)
-    processed_ids: set[str] = set()
+        if ENABLE_BETTER_BOOKING:
+            # 🔥 COMPRA REAL usando el flujo nuevo con LiveBetterClient
+            #     → esto además actualiza booked_court_name / booked_slot_start / booked_slot_end
+            result = book_best_slot_for_request(req)
+            logger.info("[Scheduler] Resultado BOOKING para %s: %s", rid, result.message)
 
-    for req in requests:
-        rid = req["id"]
-        if rid in processed_ids:
-            print(f"[Scheduler] Skip {rid}: ya procesada en este run.")
-            continue
-        run_mode = os.environ.get("RUN_MODE", "ANY")
-        if run_mode == "RELEASE_ONLY":
-            tz = zoneinfo.ZoneInfo("Europe/London")
-            now_lon = now.astimezone(tz)
-            tgt = date.fromisoformat(req["target_date"])
-            release_date = tgt - timedelta(days=7)
-            if now_lon.date() != release_date:
-                print(f"[Scheduler] (RELEASE_ONLY) Skip {req['id']}: target_date={tgt} (t+7={release_date}), hoy={now_lon.date()}.")
-                continue
-        action = should_process_request(req, now)
-
-        if action == "EXPIRE":
-            print(f"[Scheduler] Marcando como EXPIRED request {rid} (target_date ya pasó).")
-            try:
-                updated = update_request_seen(
-                    rid,
-                    new_status="EXPIRED",
-                    last_error="EXPIRED: target_date passed",
+            # Reintento 1× con el MISMO flujo si el checkout falló o se cortó la red
+            if result.retry:
+                logger.info("[Scheduler] error reintentable (checkout non-422 / red): retrying once…")
+                result = book_best_slot_for_request(req)
+                logger.info("[Scheduler] Resultado BOOKING (retry) para %s: %s", rid, result.message)
+
+        else:
+            # 🔍 SOLO RADAR (lo que acabas de ver en el log)
+            result = book_best_slot_for_request(req, dry_run=True)
+            logger.info("[Scheduler] Resultado del radar Better para %s: %s", rid, result.message)
+
+        new_status, message = result.status, result.message
+        queue_status_update(updates, req, new_status, message)
+
+        # Encadenar bloque contiguo (solo si el primero quedó BOOKED)
+        if new_status == "BOOKED":
+            sib = find_consecutive_sibling(req, siblings)
+            if sib:
+                first_court_number = extract_booked_court_number_from_message(message)
+                logger.info(
+                    "[Scheduler] Intentando bloque contiguo para %s (%s-%s)… forced_court_number=%s",
+                    sib["id"], sib["_start_hm"], sib["_end_hm"], first_court_number,
                 )
-                print(
-                    f"[Scheduler] Request {rid} actualizada a EXPIRED "
-                    f"(attempt_count={updated['attempt_count']}, "
-                    f"last_run_at={updated['last_run_at']})."
+                result2 = book_best_slot_for_request(
+                    sib,
+                    forced_court_number=first_court_number,
                 )
-            except Exception as e:
-                print(f"[Scheduler] Error al actualizar {rid}: {e}", file=sys.stderr)
-                continue
-
-        elif action == "SKIP":
-            print(f"[Scheduler] SKIP request {rid} (todavía no toca o fuera de ventana).")
-            continue
-
-        elif action == "PROCESS":
-            print(f"[Scheduler] >>> Toca procesar request {rid} ahora mismo.")
-
-            # Flag para activar o no el booking real
-            enable_booking = os.environ.get("ENABLE_BETTER_BOOKING", "").lower() == "true"
-
-            if enable_booking:
-                # 🔥 COMPRA REAL usando el flujo nuevo con LiveBetterClient
-                #     → esto además actualiza booked_court_name / booked_slot_start / booked_slot_end
-                message = book_best_slot_for_request(req)
-                print(f"[Scheduler] Resultado BOOKING para {rid}: {message}")
-
-                # Reintento 1× con el MISMO flujo si el checkout falló
-                if message.startswith("ERROR_BOOKING_CHECKOUT") and "422" not in message:
-                    print("[Scheduler] checkout error (non-422): retrying once…")
-                    message = book_best_slot_for_request(req)
-                    print(f"[Scheduler] Resultado BOOKING (retry) para {rid}: {message}")
-
-                # Mapeo de estado (igual que antes)
-                if message.startswith("BOOKING_OK"):
-                    new_status = "BOOKED"
-                elif message.startswith("BOOKING_IN_CART"):
-                    new_status = "SEARCHING"   # seguimos intentando (y evitamos romper constraint)
-                elif message.startswith("BOOKING_NO_SLOTS"):
-                    new_status = "SEARCHING"
-                elif message.startswith("BOOKING_NO_CREDIT"):
-                    new_status = "SEARCHING"
-                elif message.startswith("ERROR_BOOKING_SLOTS") and any(code in message for code in (" 500", " 502", " 503", " 504")):
-                    new_status = "SEARCHING"  # Better caído / inestable: seguir intentando
-                elif message.startswith("ERROR_BOOKING_CHECKOUT") and "422" in message:
-                    new_status = "SEARCHING"   # idem
-                elif message.startswith("ERROR_BOOKING_"):
-                    new_status = "FAILED"
+                st2, msg2 = result2.status, result2.message
+                queue_status_update(updates, sib, st2, msg2)
+                processed_ids.add(sib["id"])
+
+                if st2 == "BOOKED":
+                    logger.info("[Scheduler] Segundo bloque BOOKED (request %s).", sib["id"])
                 else:
-                    new_status = "FAILED"
+                    logger.info("[Scheduler] Segundo bloque %s (request %s): %s", st2, sib["id"], msg2)
 
 
-            else:
-                # 🔍 SOLO RADAR (lo que acabas de ver en el log)
-                message = probe_better_slots_for_request(req)
-                print(f"[Scheduler] Resultado del radar Better para {rid}: {message}")
 
-                # En modo radar nunca cambiamos a ERROR para no romper el check
-                new_status = "SEARCHING"
+    elif action == "WAIT_RELEASE":
+        if clock.run_mode == "RELEASE_ONLY":
+            logger.info("[Scheduler] Aún no es la hora de apertura; se espera al diario de las 22:00 London.")
+        # En hourly (RUN_MODE=ANY) no decimos nada; simplemente lo saltamos
+        return
 
-            try:
-                updated = update_request_seen(
-                    rid,
-                    new_status=new_status,
-                    last_error=message,
-                )
-                print(
-                    f"[Scheduler] Request {rid} actualizada "
-                    f"(attempt_count={updated['attempt_count']}, "
-                    f"last_run_at={updated['last_run_at']})."
-                )
-            except Exception as e:
-                print(f"[Scheduler] Error al actualizar {rid}: {e}", file=sys.stderr)
-                continue
-
-            # Encadenar bloque contiguo (solo si el primero quedó BOOKED)
-            if new_status == "BOOKED":
-                sib = find_consecutive_sibling(req, requests)
-                if sib:
-                    first_court_number = extract_booked_court_number_from_message(message)
-                    print(
-                        f"[Scheduler] Intentando bloque contiguo para {sib['id']} ({sib['target_start_time'][:5]}-{sib['target_end_time'][:5]})… "
-                        f"forced_court_number={first_court_number}"
-                    )
-                    msg2 = book_best_slot_for_request(
-                        sib,
-                        forced_court_number=first_court_number,
-                    )
+    elif action == "CLOSE":
+        # Cerrar en t+1: no seguir buscando
+        queue_status_update(
+            updates,
+            req,
+            "CLOSED",
+            "AUTO_CLOSED_T+1: no se encontraron canchas dentro del período de liberación.",
+            is_active=False,
+        )
+        logger.info("[Scheduler] Request %s marcada CLOSED (t+1).", req["id"])
 
-                    if msg2.startswith("BOOKING_OK"):
-                        try:
-                            update_request_seen(
-                                sib["id"],
-                                new_status="BOOKED",
-                                last_error=msg2,
-                            )
-                            print(f"[Scheduler] Segundo bloque BOOKED (request {sib['id']}).")
-                            processed_ids.add(sib["id"])
-                        except Exception as e:
-                            print(f"[Scheduler] Error al actualizar segundo bloque {sib['id']}: {e}", file=sys.stderr)
-
-                    elif msg2.startswith("BOOKING_NO_SLOTS"):
-                        try:
-                            update_request_seen(
-                                sib["id"],
-                                new_status="SEARCHING",
-                                last_error=msg2,
-                            )
-                            print(f"[Scheduler] Segundo bloque sin cupos (request {sib['id']}).")
-                            processed_ids.add(sib["id"])
-                        except Exception as e:
-                            print(f"[Scheduler] Error al marcar SEARCHING el segundo bloque {sib['id']}: {e}", file=sys.stderr)
 
-                    else:
-                        # Mapeo “seguro” para el segundo bloque (igual que el primero)
-                        if msg2.startswith("BOOKING_IN_CART"):
-                            st2 = "SEARCHING"
-                        elif msg2.startswith("BOOKING_NO_CREDIT"):
-                            st2 = "SEARCHING"   # como tú quieres
-                        elif msg2.startswith("BOOKING_NO_SLOTS"):
-                            st2 = "SEARCHING"
-                        elif msg2.startswith("ERROR_BOOKING_SLOTS") and any(code in msg2 for code in (" 500", " 502", " 503", " 504")):
-                            st2 = "SEARCHING"
-                        elif msg2.startswith("ERROR_BOOKING_CHECKOUT") and "422" in msg2:
-                            st2 = "SEARCHING"
-                        elif msg2.startswith("ERROR_BOOKING_"):
-                            st2 = "FAILED"
-                        else:
-                            st2 = "FAILED"
-
-                        try:
-                            update_request_seen(
-                                sib["id"],
-                                new_status=st2,
-                                last_error=msg2,
-                            )
-                            print(f"[Scheduler] Segundo bloque {st2} (request {sib['id']}): {msg2}")
-                            processed_ids.add(sib["id"])
-                        except Exception as e:
-                            print(f"[Scheduler] Error al actualizar segundo bloque {sib['id']}: {e}", file=sys.stderr)
-
-
-
-        elif action == "WAIT_RELEASE":
-            if os.environ.get("RUN_MODE") == "RELEASE_ONLY":
-                print("[Scheduler] Aún no es la hora de apertura; se espera al diario de las 22:00 London.")
-            # En hourly (RUN_MODE=ANY) no decimos nada; simplemente lo saltamos
-            continue
-
-        elif action == "CLOSE":
-            # Cerrar en t+1: no seguir buscando
-            try:
-                updated = update_request_seen(
-                    req["id"],
-                    new_status="CLOSED",  # <= COMA OBLIGATORIA
-                    last_error="AUTO_CLOSED_T+1: no se encontraron canchas dentro del período de liberación.",
-                    is_active=False,  # (opcional) descomenta si tu helper acepta este campo
+def configure_logging() -> None:
+    """
+    Logs del scheduler: INFO a stdout y ERROR a stderr, cada línea al momento
+    (sin buffer: el log del workflow es el único registro del run, y así sale
+    intercalado en orden con los logs de LiveBetterClient y no se pierde si el
+    runner mata el proceso). Solo toca el logger "scheduler" y no propaga al
+    root. El root no se toca aquí, pero book_better.main ya lo configura a
+    INFO al importarse, así que los logs de LiveBetterClient sí salen (stderr).
+    """
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+    stdout_handler.addFilter(lambda record: record.levelno < logging.ERROR)
+
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.ERROR)
+    stderr_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger.handlers[:] = [stdout_handler, stderr_handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def main() -> int:
+    configure_logging()
+    start_run = datetime.now(timezone.utc)
+    logger.info("[Scheduler] Ejecutando a las %s", start_run.isoformat())
+    start_lon = start_run.astimezone(_LONDON_TZ)
+    # Sin valor por defecto a propósito: el guard hourly solo aplica con ANY explícito
+    run_mode = os.environ.get("RUN_MODE")
+
+    # --- Guard de horario sólo para el HOURLY ---
+    if run_mode == "ANY":
+        h = start_lon.hour
+        # Permitido: 07–23 Londres, EXCEPTUANDO 20 y 21
+        if not (7 <= h <= 23) or h in (20, 21):
+            logger.info("[Scheduler] Hourly: fuera de ventana (permitido 07–23 London, excl. 20–21). Salgo.")
+            sys.exit(0)
+
+    # En el diario solo cuentan las requests cuyo t+7 es hoy (London): el resto
+    # se descartaría en process_request, así que ni las pedimos. Se deja un día
+    # de margen por si la espera cruza la medianoche.
+    today_lon = start_lon.date()
+    if run_mode == "RELEASE_ONLY":
+        requests = get_pending_requests(
+            limit=50,
+            target_date_from=today_lon + timedelta(days=7),
+            target_date_to=today_lon + timedelta(days=8),
+        )
+    else:
+        requests = get_pending_requests(limit=50)
+    logger.info("[Scheduler] Encontradas %s requests PENDING/SEARCHING activas.", len(requests))
+
+    # Fechas/horas parseadas una sola vez por fila; las filas que no parsean se
+    # descartan aquí en vez de tumbar el run a mitad
+    normalized: list[dict] = []
+    for req in requests:
+        try:
+            normalized.append(normalize_request(req))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("[Scheduler] Request %s con fechas/horas inválidas, se omite: %r", req.get("id"), e)
+    requests = normalized
+
+    # venue/activity validados antes de la espera: una fila con slugs inválidos
+    # no va a reservar nunca, así que se aparta (sin credenciales, login previo
+    # ni índice de hermanas). Su estado se decide tras la espera como el de
+    # cualquier otra: EXPIRE/CLOSE/SKIP igual, y en PROCESS falla antes del login
+    updates: list[dict] = []
+    valid: list[dict] = []
+    invalid: list[dict] = []
+    for req in requests:
+        try:
+            valid.append(resolve_venue_activity(req))
+        except (KeyError, ValueError) as e:
+            logger.error("[Scheduler] Request %s con venue/activity inválidos: %r", req["id"], e)
+            invalid.append(req)
+    requests = valid
+
+    # Desde aquí, lo ya encolado en updates (p.ej. slugs inválidos) se escribe
+    # aunque la espera o el proceso terminen con una excepción, incluido el
+    # SystemExit de exit_on_stop_signals por SIGTERM/SIGINT durante la espera.
+    # Un SIGTERM fuera de la espera mata el proceso sin pasar por el finally.
+    skipped: list[str] = []
+    try:
+        # Credenciales de todas las cuentas en una sola consulta, antes de la espera
+        prefetch_credentials(requests)
+
+        # --- ESPERA EXCLUSIVA PARA EL DIARIO ---
+        # Si corremos en modo diario (RELEASE_ONLY) y no nos han pedido saltar la espera,
+        # bloqueamos hasta la hora objetivo en Londres antes de procesar NADA.
+        # Si ninguna request se libera hoy (t+7), no hay nada que esperar: el
+        # proceso de abajo las va a saltar todas igualmente
+        waited = False
+        if run_mode == "RELEASE_ONLY" and not any(
+            r["_release_date"] == today_lon for r in requests
+        ):
+            logger.info("[Scheduler] Diario: ninguna request se libera hoy; no se espera a la apertura.")
+        elif run_mode == "RELEASE_ONLY" and os.environ.get("SKIP_WAIT", "0") != "1":
+            waited = True
+            target_hms = os.environ.get("TARGET_TIME_LONDON", "22:00:01")
+            tz_name = os.environ.get("TARGET_TZ_NAME", "Europe/London")
+            logger.info("[Scheduler] Diario: esperando hasta %s %s antes de procesar…", target_hms, tz_name)
+            with exit_on_stop_signals():
+                wait_until_local(
+                    target_hms,
+                    tz_name,
+                    on_last_minute=lambda time_left: prewarm_clients(requests, time_left),
                 )
-                print(f"[Scheduler] Request {req['id']} marcada CLOSED (t+1).")
-            except Exception as e:
-                print(f"[Scheduler] Error al cerrar {req['id']}: {e}", file=sys.stderr)
-            continue
 
+        # Tras la espera hay que recalcular 'now'; sin espera (hourly o SKIP_WAIT)
+        # vale el instante de arranque
+        now = datetime.now(timezone.utc) if waited else start_run
+        clock = make_run_clock(now)
+        processed_ids: set[str] = set()
+        _slots_by_query.clear()
+        siblings = build_sibling_index(requests)
+
+        # Las requests de una misma cuenta van en serie (comparten carrito y crédito,
+        # y el bloque contiguo depende del primero); cuentas distintas en paralelo.
+        groups: dict[str, list[dict]] = {}
+        for req in requests:
+            groups.setdefault(str(req.get("better_account_id") or ""), []).append(req)
+
+        def process_group(group: list[dict]) -> None:
+            for req in group:
+                try:
+                    process_request(req, siblings, clock, processed_ids, updates, skipped)
+                except Exception as e:
+                    # Un fallo inesperado no debe cortar el resto de la cuenta ni
+                    # del run. Si la request ya encoló su estado (p.ej. BOOKED antes
+                    # de fallar el bloque contiguo) se respeta; si no, se marca.
+                    logger.exception("[Scheduler] Error inesperado procesando %s: %r", req["id"], e)
+                    if any(u["id"] == req["id"] for u in updates):
+                        continue
+                    if isinstance(e, RequestException) or not ENABLE_BETTER_BOOKING:
+                        new_status = "SEARCHING"  # red / Better inestable: seguir intentando
+                    else:
+                        new_status = "FAILED"
+                    queue_status_update(updates, req, new_status, f"ERROR_SCHEDULER: {e!r}")
+
+        # Las de slugs inválidos no llaman a Better: en este mismo hilo
+        process_group(invalid)
+        if len(groups) == 1:
+            # Una sola cuenta: en el propio hilo, sin montar el pool
+            process_group(next(iter(groups.values())))
+        elif groups:
+            max_workers = max(1, min(_max_workers_from_env(), len(groups)))
+            logger.info("[Scheduler] %s cuentas, %s en paralelo.", len(groups), max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(process_group, groups.values()))
+    finally:
+        # Las excepciones de los workers ya se convierten en estado en
+        # process_group; esto cubre el resto (y el SystemExit de la espera).
+        # Los BOOKED no dependen de esto: update_request_booked ya los escribió
+        if skipped:
+            logger.info(
+                "[Scheduler] SKIP %s requests (todavía no toca o fuera de ventana): %s",
+                len(skipped), skipped,
+            )
 
+        # Los cambios de estado del run se escriben al final (un PATCH por request)
+        if updates:
+            try:
+                for updated in bulk_update_requests_seen(updates):
+                    logger.info(
+                        "[Scheduler] Request %s actualizada a %s (attempt_count=%s, last_run_at=%s).",
+                        updated["id"], updated.get("status"), updated["attempt_count"], updated["last_run_at"],
+                    )
+            except Exception as e:
+                logger.error("[Scheduler] Error al escribir los estados del run: %s", e)
 
     end_run = datetime.now(timezone.utc)
     elapsed = (end_run - start_run).total_seconds()
-    print(
-        f"[Scheduler] Fin de la ejecución. "
-        f"Duración total: {elapsed:.3f} segundos."
+    logger.info(
+        "[Scheduler] Fin de la ejecución. Duración total: %.3f segundos.",
+        elapsed,
     )
-
     return 0
 
 
@@ -1,10 +1,14 @@
+import functools
 import os
+import sys
 from datetime import date, datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Tuple
-import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from dotenv import load_dotenv
-from supabase import Client, create_client
+
+from book_better.utils import json_dumps, json_loads
 
 # Cargar .env
 load_dotenv()
@@ -13,15 +17,6 @@ load_dotenv()
 # VITE_SUPABASE_URL y SUPABASE_SERVICE_ROLE_KEY
 SUPABASE_URL = os.environ.get("VITE_SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-SUPABASE_SERVICE_ROLE = os.environ.get("SUPABASE_SERVICE_ROLE") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE:
-    raise RuntimeError("Faltan SUPABASE_URL / SUPABASE_SERVICE_ROLE (o VITE_SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY) en envs.")
-
-client: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE)
-
-# alias usado por get_pending_requests:
-supabase = client
 
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     raise RuntimeError(
@@ -36,49 +31,95 @@ HEADERS = {
     "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
 }
 
+# Reintentos ante 5xx/Cloudflare, 429 y cortes de conexión para todas las
+# llamadas REST: backoff exponencial con jitter (para no reintentar todos a la
+# vez) y respetando Retry-After. Los PATCH/POST que hacemos son idempotentes
+# (valores fijos, upsert por id), así que también se reintentan. Al agotar los
+# reintentos se devuelve la última respuesta y cada helper lanza su error.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "PATCH", "POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+@functools.cache
+def _session() -> requests.Session:
+    """
+    Una sola sesión (keep-alive + pool) para todas las llamadas REST, en vez de
+    abrir TCP+TLS nuevo en cada requests.get/patch. Lleva ya HEADERS; el pool
+    cubre los hilos del scheduler (SCHEDULER_MAX_WORKERS, 16 por defecto).
+    Se crea en la primera llamada, no al importar el módulo.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+    return session
+
+# Cabeceras extra de los PATCH (apikey/Authorization ya van en _session())
+_PATCH_HEADERS = {
+    "Content-Type": "application/json",
+    "Prefer": "return=representation",
+}
 
-def get_pending_requests(limit: int = 50, max_retries: int = 3):
+# Columnas que devuelven los PATCH/upsert: solo las que leen los callers (el
+# log del scheduler), no la fila entera serializada por PostgREST
+_RETURN_COLS = "id,status,attempt_count,last_run_at,last_error"
+
+
+# Columnas y estados de get_pending_requests: texto fijo, se arma una vez
+_SELECT_COLS = (
+    "id,better_account_id,profile_id,"
+    "venue_slug,activity_slug,"
+    "target_date,target_start_time,target_end_time,"
+    "search_start_date,search_window_start_time,search_window_end_time,"
+    "preferred_court_name_1,preferred_court_name_2,preferred_court_name_3,"
+    "status,is_active,attempt_count,last_run_at,last_error"
+)
+_STATUS_IN = "in.(PENDING,SEARCHING,CREATED,QUEUED)"
+
+def get_pending_requests(
+    limit: int = 50,
+    target_date_from: date | None = None,
+    target_date_to: date | None = None,
+):
     """
     Lee las requests activas que el scheduler puede procesar.
-    Retry defensivo ante 5xx/Cloudflare para evitar caídas espurias.
+    Los reintentos ante 5xx/Cloudflare los hace _session() (ver _RETRY).
+    target_date_from / target_date_to acotan target_date en el servidor
+    (por defecto: desde hace 14 días, sin tope).
     """
-    select_cols = (
-        "id,better_account_id,profile_id,"
-        "venue_slug,activity_slug,"
-        "target_date,target_start_time,target_end_time,"
-        "search_start_date,search_window_start_time,search_window_end_time,"
-        "preferred_court_name_1,preferred_court_name_2,preferred_court_name_3,"
-        "status,is_active,attempt_count,last_run_at,last_error"
-    )
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            q = supabase.from_("court_booking_requests").select(select_cols)
-            q = q.eq("is_active", True)
-            q = q.in_("status", ["PENDING", "SEARCHING", "CREATED", "QUEUED"])
-            q = q.gte("target_date", (date.today() - timedelta(days=14)).isoformat())
-            q = q.lte("search_start_date", date.today().isoformat())
-            q = q.order("target_date", desc=False)  # ascendente
-            q = q.limit(limit)
-
-            res = q.execute()
-            data = getattr(res, "data", None)
-            if data is None:
-                raise RuntimeError(f"Supabase devolvió respuesta vacía (intento {attempt}): {res}")
-            return data
-
-        except Exception as e:
-            msg = str(e)
-            transient = (
-                "Internal Server Error" in msg
-                or "502" in msg or "503" in msg or "504" in msg
-            )
-            if attempt < max_retries and transient:
-                backoff = 0.8 * attempt
-                print(f"[Supabase] 5xx/transient (intento {attempt}), reintentando en {backoff:.1f}s…")
-                time.sleep(backoff)
-                continue
-            raise RuntimeError(f"Error al leer court_booking_requests: {msg}") from e
+    today = date.today()
+    if target_date_from is None:
+        target_date_from = today - timedelta(days=14)
+
+    # Lista de pares: target_date puede llevar dos filtros (gte y lte)
+    params = [
+        ("select", _SELECT_COLS),
+        ("is_active", "eq.true"),
+        ("status", _STATUS_IN),
+        ("target_date", f"gte.{target_date_from.isoformat()}"),
+    ]
+    if target_date_to is not None:
+        params.append(("target_date", f"lte.{target_date_to.isoformat()}"))
+    params += [
+        ("search_start_date", f"lte.{today.isoformat()}"),
+        ("order", "target_date.asc"),
+        ("limit", str(limit)),
+    ]
+
+    try:
+        resp = _session().get(f"{REST_URL}/court_booking_requests", params=params, timeout=30)
+    except requests.RequestException as e:
+        raise RuntimeError(f"Error al leer court_booking_requests: {e}") from e
+    if not resp.ok:
+        raise RuntimeError(
+            f"Error al leer court_booking_requests: {resp.status_code} {resp.text}"
+        )
+    return json_loads(resp.content)
 
 
 def update_request_seen(
@@ -86,6 +127,7 @@ def update_request_seen(
     new_status: str | None = None,
     last_error: str | None = None,
     is_active: bool | None = None,
+    attempt_count: int | None = None,
 ) -> Dict[str, Any]:
     """
     Actualiza una request marcando que el bot la ha revisado:
@@ -93,31 +135,29 @@ def update_request_seen(
     - attempt_count = attempt_count + 1
     - status = 'SEARCHING' (por defecto) o lo que pases en new_status
     - last_error opcional, para guardar mensaje del radar Better
+    Si ya tienes la fila (p.ej. de get_pending_requests), pasa su attempt_count
+    y se ahorra el GET previo: queda un único PATCH.
     """
-    now_iso = datetime.now(timezone.utc).isoformat()
-
-    # Empieza con los campos que siempre actualizas
-    fields: dict = {
-        "last_run_at": now_iso,
-    }
-    
-    # 1) Obtener la fila actual para saber attempt_count
-    get_url = f"{REST_URL}/court_booking_requests"
-    get_params = {"id": f"eq.{request_id}"}
-
-    get_resp = requests.get(get_url, headers=HEADERS, params=get_params, timeout=30)
-    if not get_resp.ok:
-        raise RuntimeError(
-            f"Error al leer la request {request_id}: "
-            f"{get_resp.status_code} {get_resp.text}"
-        )
+    if attempt_count is not None:
+        current_attempts = attempt_count
+    else:
+        # 1) Obtener la fila actual para saber attempt_count
+        get_url = f"{REST_URL}/court_booking_requests"
+        get_params = {"id": f"eq.{request_id}"}
+
+        get_resp = _session().get(get_url, params=get_params, timeout=30)
+        if not get_resp.ok:
+            raise RuntimeError(
+                f"Error al leer la request {request_id}: "
+                f"{get_resp.status_code} {get_resp.text}"
+            )
 
-    rows = get_resp.json()
-    if not rows:
-        raise RuntimeError(f"No se encontró court_booking_request con id={request_id}")
+        rows = json_loads(get_resp.content)
+        if not rows:
+            raise RuntimeError(f"No se encontró court_booking_request con id={request_id}")
 
-    current = rows[0]
-    current_attempts = current.get("attempt_count") or 0
+        current = rows[0]
+        current_attempts = current.get("attempt_count") or 0
 
     payload = {
         "last_run_at": datetime.now(timezone.utc).isoformat(),
@@ -132,20 +172,18 @@ def update_request_seen(
     if is_active is not None:
         payload["is_active"] = is_active
 
-    patch_url = f"{REST_URL}/court_booking_requests"
-    patch_params = {"id": f"eq.{request_id}"}
+    return _patch_request(request_id, payload)
 
-    patch_headers = {
-        **HEADERS,
-        "Content-Type": "application/json",
-        "Prefer": "return=representation",
-    }
+def _patch_request(request_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """PATCH de una sola fila de court_booking_requests; devuelve la fila actualizada (solo _RETURN_COLS)."""
+    patch_url = f"{REST_URL}/court_booking_requests"
+    patch_params = {"id": f"eq.{request_id}", "select": _RETURN_COLS}
 
-    patch_resp = requests.patch(
+    patch_resp = _session().patch(
         patch_url,
-        headers=patch_headers,
+        headers=_PATCH_HEADERS,
         params=patch_params,
-        json=payload,
+        data=json_dumps(payload),
         timeout=30,
     )
 
@@ -155,12 +193,82 @@ def update_request_seen(
             f"{patch_resp.status_code} {patch_resp.text}"
         )
 
-    updated_rows = patch_resp.json()
+    updated_rows = json_loads(patch_resp.content)
     if not updated_rows:
         raise RuntimeError(f"No se devolvieron filas actualizadas para id={request_id}")
 
     return updated_rows[0]
 
+def _patch_requests(request_ids: List[str], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Mismo payload para varias filas en un solo PATCH (id=in.(...)).
+    Devuelve las filas actualizadas (los ids que no existan no aparecen).
+    """
+    if len(request_ids) == 1:
+        return [_patch_request(request_ids[0], payload)]
+
+    patch_resp = _session().patch(
+        f"{REST_URL}/court_booking_requests",
+        headers=_PATCH_HEADERS,
+        params={"id": f"in.({','.join(request_ids)})", "select": _RETURN_COLS},
+        data=json_dumps(payload),
+        timeout=30,
+    )
+    if not patch_resp.ok:
+        raise RuntimeError(
+            f"Error al actualizar las requests {', '.join(request_ids)}: "
+            f"{patch_resp.status_code} {patch_resp.text}"
+        )
+    return json_loads(patch_resp.content)
+
+def bulk_update_requests_seen(updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    update_request_seen para todas las requests de un run del scheduler, al final.
+    Cada entrada lleva:
+    - id, attempt_count (el valor leído en get_pending_requests)
+    - status, last_error y opcionalmente is_active
+    Todas con el mismo last_run_at. En la práctica es un PATCH por fila:
+    attempt_count y last_error son propios de cada request, así que solo
+    comparten PATCH las filas con el payload idéntico. Solo PATCH sobre filas
+    existentes (un
+    upsert parcial lo rechaza el NOT NULL de la tabla y, si pasara, podría
+    reinsertar como fila vacía un id borrado a mitad del run).
+    """
+    if not updates:
+        return []
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+
+    # Una sola fila por id (gana la última actualización del run)
+    payload_by_id: Dict[str, Dict[str, Any]] = {}
+    for u in updates:
+        payload = {
+            "last_run_at": now_iso,
+            "attempt_count": (u.get("attempt_count") or 0) + 1,
+            "status": u["status"],
+        }
+        if u.get("last_error") is not None:
+            payload["last_error"] = u["last_error"]
+        if u.get("is_active") is not None:
+            payload["is_active"] = u["is_active"]
+        payload_by_id[u["id"]] = payload
+
+    # attempt_count ya viene calculado: basta un PATCH, sin el GET previo de
+    # update_request_seen. Si dos filas coinciden en todo (raro: mismo
+    # attempt_count y last_error) van juntas en un id=in.(...)
+    ids_by_payload: Dict[Tuple[Tuple[str, Any], ...], List[str]] = {}
+    for request_id, payload in payload_by_id.items():
+        ids_by_payload.setdefault(tuple(payload.items()), []).append(request_id)
+
+    updated: List[Dict[str, Any]] = []
+    for payload_key, ids in ids_by_payload.items():
+        try:
+            updated.extend(_patch_requests(ids, dict(payload_key)))
+        except Exception as e:
+            print(f"[Supabase] Error al actualizar {', '.join(ids)}: {e}", file=sys.stderr)
+
+    return updated
+
 def update_request_booked(
     request_id: str,
     booked_court_name: str,
@@ -170,7 +278,7 @@ def update_request_booked(
 ) -> Dict[str, Any]:
     """Marca la request como BOOKED y guarda los campos booked_*."""
     patch_url = f"{REST_URL}/court_booking_requests"
-    patch_params = {"id": f"eq.{request_id}"}
+    patch_params = {"id": f"eq.{request_id}", "select": _RETURN_COLS}
     payload = {
         "status": "BOOKED",
         "is_active": False,
@@ -182,11 +290,10 @@ def update_request_booked(
     if last_error is not None:
         payload["last_error"] = last_error
 
-    patch_headers = {**HEADERS, "Content-Type": "application/json", "Prefer": "return=representation"}
-    resp = requests.patch(patch_url, headers=patch_headers, params=patch_params, json=payload, timeout=30)
+    resp = _session().patch(patch_url, headers=_PATCH_HEADERS, params=patch_params, data=json_dumps(payload), timeout=30)
     if not resp.ok:
         raise RuntimeError(f"Error al actualizar BOOKED {request_id}: {resp.status_code} {resp.text}")
-    rows = resp.json()
+    rows = json_loads(resp.content)
     if not rows:
         raise RuntimeError(f"PATCH BOOKED sin filas devueltas para id={request_id}")
     return rows[0]
@@ -197,10 +304,14 @@ def resolve_credentials_for_request(req: Dict[str, Any]) -> Tuple[str, str]:
     Requiere que la fila apunte a better_account_id correcto.
     """
     ba = get_booking_account(req["better_account_id"])
+    return credentials_from_booking_account(ba)
+
+def credentials_from_booking_account(ba: Dict[str, Any]) -> Tuple[str, str]:
+    """Usuario/clave a partir de una fila de booking_accounts ya leída."""
     user_key = ba.get("env_username_key")
     pass_key = ba.get("env_password_key")
     if not user_key or not pass_key:
-        raise RuntimeError(f"Faltan env keys en booking_accounts para {req['better_account_id']}")
+        raise RuntimeError(f"Faltan env keys en booking_accounts para {ba.get('id')}")
     username = os.environ.get(user_key)
     password = os.environ.get(pass_key)
     if not username or not password:
@@ -211,34 +322,59 @@ def get_booking_account(better_account_id: str) -> Dict[str, Any]:
     """Devuelve la fila de booking_accounts (por id)."""
     url = f"{REST_URL}/booking_accounts"
     params = {"id": f"eq.{better_account_id}", "limit": "1"}
-    resp = requests.get(url, headers=HEADERS, params=params, timeout=30)
+    resp = _session().get(url, params=params, timeout=30)
     if not resp.ok:
         raise RuntimeError(f"booking_accounts GET error: {resp.status_code} {resp.text}")
-    rows = resp.json()
+    rows = json_loads(resp.content)
     if not rows:
         raise RuntimeError(f"booking_account no encontrado: {better_account_id}")
     return rows[0]
 
+def get_booking_accounts(better_account_ids) -> Dict[str, Dict[str, Any]]:
+    """
+    Varias filas de booking_accounts en una sola consulta (id=in.(...)).
+    Devuelve {id: fila}; los ids que no existan simplemente no aparecen.
+    """
+    ids = sorted({str(i) for i in better_account_ids if i})
+    if not ids:
+        return {}
+    url = f"{REST_URL}/booking_accounts"
+    params = {"id": f"in.({','.join(ids)})"}
+    resp = _session().get(url, params=params, timeout=30)
+    if not resp.ok:
+        raise RuntimeError(f"booking_accounts GET error: {resp.status_code} {resp.text}")
+    return {str(row["id"]): row for row in json_loads(resp.content)}
+
 if __name__ == "__main__":
     # Test rápido desde la repo de better
     print("[Supabase Python] Leyendo court_booking_requests PENDING/SEARCHING...")
     pending = get_pending_requests(limit=10)
     print(f"Encontradas {len(pending)} requests.")
+    # Un solo write para todas las filas en vez de 9 prints por fila
+    lines = []
     for req in pending:
-        print("---")
-        print("id:", req["id"])
-        print("profile_id:", req["profile_id"])
-        print("better_account_id:", req["better_account_id"])
-        print("target_date:", req["target_date"])
-        print("target_time:", f"{req['target_start_time']}–{req['target_end_time']}")
-        print("status:", req["status"])
-        print("attempt_count:", req["attempt_count"])
-        print("last_run_at:", req["last_run_at"])
+        lines += [
+            "---",
+            f"id: {req['id']}",
+            f"profile_id: {req['profile_id']}",
+            f"better_account_id: {req['better_account_id']}",
+            f"target_date: {req['target_date']}",
+            f"target_time: {req['target_start_time']}–{req['target_end_time']}",
+            f"status: {req['status']}",
+            f"attempt_count: {req['attempt_count']}",
+            f"last_run_at: {req['last_run_at']}",
+        ]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
     if pending:
         first = pending[0]
         print("\nActualizando la primera request a SEARCHING...")
-        updated = update_request_seen(first["id"], new_status="SEARCHING")
+        updated = update_request_seen(
+            first["id"],
+            new_status="SEARCHING",
+            attempt_count=first["attempt_count"] or 0,
+        )
         print("Fila actualizada:")
         print(updated)
     else: